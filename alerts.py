@@ -0,0 +1,117 @@
+import time
+import queue
+import threading
+try:
+    import winsound
+except ImportError:
+    winsound = None
+
+# Backend registry: name -> callable(title, message)
+BACKENDS = {}
+
+def register_backend(name):
+    """Decorator that makes an alert backend available under `name`."""
+    def decorator(func):
+        BACKENDS[name] = func
+        return func
+    return decorator
+
+def unregister_backend(name):
+    BACKENDS.pop(name, None)
+
+@register_backend("sound")
+def sound_backend(title, message):
+    if winsound:
+        winsound.Beep(1000, 1000) # Frequency, Duration
+
+@register_backend("notification")
+def notification_backend(title, message):
+    from plyer import notification
+    notification.notify(
+        title=title,
+        message=message,
+        app_name='Timer App',
+        timeout=10
+    )
+
+class AlertDispatcher:
+    """Delivers alerts from a background worker so callers never block.
+
+    Alerts arriving within `coalesce_window` seconds of each other are merged
+    into one, so many timers finishing together produce a single beep and
+    notification. Every backend call runs in its own daemon thread and is
+    abandoned after `timeout` seconds, so a stalled backend cannot hold up
+    later alerts.
+    """
+
+    def __init__(self, backends=None, timeout=5.0, coalesce_window=0.2):
+        self.backends = backends # Names from BACKENDS; None means all registered
+        self.timeout = timeout
+        self.coalesce_window = coalesce_window
+        self.queue = queue.Queue()
+        self.worker = None
+        self.lock = threading.Lock()
+
+    def dispatch(self, title, message):
+        """Queues an alert and returns immediately."""
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self._run, name="AlertDispatcher", daemon=True)
+                self.worker.start()
+        self.queue.put((title, message))
+
+    def close(self):
+        if self.worker is not None:
+            self.queue.put(None)
+
+    def _run(self):
+        while True:
+            alert = self.queue.get()
+            if alert is None:
+                return
+            alerts = [alert]
+            # Collect everything that arrives shortly after the first alert
+            deadline = time.monotonic() + self.coalesce_window
+            while True:
+                wait = deadline - time.monotonic()
+                try:
+                    alert = self.queue.get(timeout=wait) if wait > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if alert is None:
+                    self.deliver(*self.coalesce(alerts))
+                    return
+                alerts.append(alert)
+            self.deliver(*self.coalesce(alerts))
+
+    @staticmethod
+    def coalesce(alerts):
+        if len(alerts) == 1:
+            return alerts[0]
+        titles = {title for title, _ in alerts}
+        title = titles.pop() if len(titles) == 1 else "Alerts"
+        return f"{title} ({len(alerts)})", "\n".join(message for _, message in alerts[:5])
+
+    def deliver(self, title, message):
+        """Runs the backends concurrently, waiting at most `timeout` seconds in total."""
+        names = self.backends if self.backends is not None else list(BACKENDS)
+        calls = []
+        for name in names:
+            backend = BACKENDS.get(name)
+            if backend is None:
+                continue
+            thread = threading.Thread(target=self._call, args=(name, backend, title, message), daemon=True)
+            thread.start()
+            calls.append((name, thread))
+        deadline = time.monotonic() + self.timeout
+        for name, thread in calls:
+            thread.join(max(deadline - time.monotonic(), 0))
+            if thread.is_alive():
+                print(f"Alert backend '{name}' timed out")
+
+    @staticmethod
+    def _call(name, backend, title, message):
+        try:
+            backend(title, message)
+        except Exception as e:
+            print(f"Alert backend '{name}' failed: {e}")
@@ -0,0 +1,166 @@
+import datetime
+import itertools
+import numpy as np
+from recurrence import transitions, SECONDS_PER_DAY
+
+EPOCH = datetime.date(1970, 1, 1)
+
+class HistoryAnalytics:
+    """Columnar copy of the history (durations, timestamps and local days in NumPy arrays) for summaries.
+
+    Filtered queries are vectorized over the columns. Unfiltered ones are
+    answered from rollups built once on load and updated by `append`:
+    per-day count and total, and a count per distinct duration for
+    percentiles. Days are local calendar days, computed from the system
+    zone's precomputed UTC offset changes (recurrence.transitions).
+    """
+    COLUMNS = (('durations', float), ('timestamps', float), ('days', np.int64))
+
+    def __init__(self, store):
+        self.size = 0
+        for column, dtype in self.COLUMNS:
+            setattr(self, column, np.empty(1024, dtype))
+        self.daily = {} # local day number (days since 1970-01-01) -> [count, seconds]
+        self.duration_counts = {} # duration -> number of entries
+        self.load(store)
+
+    def __len__(self):
+        return self.size
+
+    def load(self, store):
+        with store.lock:
+            store.flush()
+            size = store.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+            rows = store.conn.execute("SELECT duration, timestamp FROM history ORDER BY id")
+            data = np.fromiter(itertools.chain.from_iterable(rows), float, count=2 * size).reshape(-1, 2)
+        self.size = 0
+        self._reserve(size)
+        self.size = size
+        self.durations[:size] = data[:, 0]
+        self.timestamps[:size] = data[:, 1]
+        self.days[:size] = self.local_days(self.timestamps[:size])
+        self.daily = {day: [count, seconds] for day, count, seconds in self._group_days(np.ones(size, dtype=bool))}
+        values, counts = np.unique(self.durations[:size], return_counts=True)
+        self.duration_counts = dict(zip(values.tolist(), counts.tolist()))
+
+    def append(self, duration, timestamp):
+        """Adds one entry (timestamp as a datetime or epoch seconds) and updates the rollups."""
+        if isinstance(timestamp, datetime.datetime):
+            timestamp = timestamp.timestamp()
+        day = int(self.local_days(np.array([timestamp]))[0])
+        self._reserve(self.size + 1)
+        self.durations[self.size] = duration
+        self.timestamps[self.size] = timestamp
+        self.days[self.size] = day
+        self.size += 1
+        rollup = self.daily.setdefault(day, [0, 0.0])
+        rollup[0] += 1
+        rollup[1] += duration
+        self.duration_counts[float(duration)] = self.duration_counts.get(float(duration), 0) + 1
+
+    def _reserve(self, size):
+        if size > len(self.durations):
+            capacity = max(size, 2 * len(self.durations))
+            for column, dtype in self.COLUMNS:
+                grown = np.empty(capacity, dtype)
+                grown[:self.size] = getattr(self, column)[:self.size]
+                setattr(self, column, grown)
+
+    @staticmethod
+    def local_days(timestamps):
+        """Local calendar day numbers for an array of epoch seconds."""
+        table = transitions(None)
+        if len(timestamps):
+            table.cover(int(timestamps.min()), int(timestamps.max()))
+        starts = np.array(table.starts)
+        offsets = np.array(table.offsets)
+        index = np.searchsorted(starts, timestamps, side="right") - 1
+        return np.floor_divide(timestamps + offsets[index], SECONDS_PER_DAY).astype(np.int64)
+
+    # --- Queries (filters as in HistoryStore.matches) ---
+    def _mask(self, start=None, end=None, min_duration=None, max_duration=None):
+        ts = self.timestamps[:self.size]
+        durations = self.durations[:self.size]
+        mask = np.ones(self.size, dtype=bool)
+        if start is not None:
+            mask &= ts >= start.timestamp()
+        if end is not None:
+            mask &= ts < end.timestamp()
+        if min_duration is not None:
+            mask &= durations >= min_duration
+        if max_duration is not None:
+            mask &= durations <= max_duration
+        return mask
+
+    def summary(self, percentiles=(50, 90, 99), **filters):
+        """Returns count, total, mean and longest duration (seconds) and duration percentiles."""
+        if any(v is not None for v in filters.values()):
+            durations = np.compress(self._mask(**filters), self.durations[:self.size])
+            result = {'count': len(durations), 'total': float(durations.sum())}
+            if len(durations):
+                result['longest'] = float(durations.max())
+                for q, value in zip(percentiles, np.percentile(durations, percentiles)):
+                    result[f"p{q}"] = float(value)
+        else:
+            values = np.fromiter(self.duration_counts.keys(), float, len(self.duration_counts))
+            counts = np.fromiter(self.duration_counts.values(), np.int64, len(self.duration_counts))
+            order = np.argsort(values)
+            values, counts = values[order], counts[order]
+            count = int(counts.sum())
+            result = {'count': count, 'total': float(values @ counts)}
+            if count:
+                result['longest'] = float(values[-1])
+                # Same as np.percentile's default (linear) method, over the sorted (value, count) pairs
+                cumulative = np.cumsum(counts)
+                for q in percentiles:
+                    rank = q / 100 * (count - 1)
+                    low, high = np.searchsorted(cumulative, [np.floor(rank), np.ceil(rank)], side="right")
+                    result[f"p{q}"] = float(values[low] + (values[high] - values[low]) * (rank - np.floor(rank)))
+        if result['count']:
+            result['mean'] = result['total'] / result['count']
+        return result
+
+    def totals_by_day(self, start=None, end=None, min_duration=None, max_duration=None):
+        """Returns [(date, count, seconds)] for every local day with entries, oldest first."""
+        first = self._day_number(start)
+        last = self._day_number(end - datetime.timedelta(microseconds=1)) if end else None
+        if min_duration is None and max_duration is None:
+            # Dates at whole-day boundaries come straight from the rollups
+            days = sorted(d for d in self.daily
+                          if (first is None or d >= first) and (last is None or d <= last))
+            rows = [(d, *self.daily[d]) for d in days]
+        else:
+            rows = self._group_days(self._mask(start, end, min_duration, max_duration))
+        return [(EPOCH + datetime.timedelta(days=d), count, seconds) for d, count, seconds in rows]
+
+    def totals_by_week(self, **filters):
+        """Returns [(monday, count, seconds)] for every week with entries, oldest first."""
+        weeks = {}
+        for date, count, seconds in self.totals_by_day(**filters):
+            monday = date - datetime.timedelta(days=date.weekday())
+            totals = weeks.setdefault(monday, [0, 0.0])
+            totals[0] += count
+            totals[1] += seconds
+        return [(monday, count, seconds) for monday, (count, seconds) in sorted(weeks.items())]
+
+    def _group_days(self, mask):
+        """Returns [(day, count, seconds)] for the entries in mask."""
+        index = np.flatnonzero(mask)
+        if not len(index):
+            return []
+        days = self.days[index]
+        # Entries are appended in time order, so each day is one run; sum the runs
+        starts = np.concatenate(([0], np.flatnonzero(days[1:] != days[:-1]) + 1))
+        counts = np.diff(np.append(starts, len(days)))
+        totals = np.add.reduceat(self.durations[index], starts)
+        grouped = {}
+        # A day can span several runs if the clock was set back
+        for day, count, seconds in zip(days[starts].tolist(), counts.tolist(), totals.tolist()):
+            rollup = grouped.setdefault(day, [0, 0.0])
+            rollup[0] += count
+            rollup[1] += seconds
+        return [(day, count, seconds) for day, (count, seconds) in sorted(grouped.items())]
+
+    @staticmethod
+    def _day_number(moment):
+        return None if moment is None else (moment.date() - EPOCH).days
@@ -0,0 +1,92 @@
+"""Startup benchmark: import time and time to first paint of the app.
+
+Each run starts a fresh process with TIMERAPP_STARTUP_REPORT set and a
+scratch app data folder; the app writes its timings once the main window
+has painted and then exits.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py [--runs 5] [--offscreen]
+    python benchmarks/bench_startup.py --exe dist\\TimerApp\\TimerApp.exe
+    python benchmarks/bench_startup.py --importtime
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_once(command, env, timeout):
+    fd, report = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    os.remove(report)
+    # Each run is its own instance, even while the app is already open
+    env = dict(env, TIMERAPP_STARTUP_REPORT=report, TIMERAPP_MULTI_INSTANCE="1")
+    launched = time.time()
+    proc = subprocess.Popen(command, env=env, cwd=ROOT)
+    try:
+        proc.wait(timeout=timeout)
+        with open(report) as f:
+            result = json.load(f)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        if os.path.exists(report):
+            os.remove(report)
+    # Wall time from spawning the process, which includes interpreter start-up
+    # and, for packaged builds, the PyInstaller bootloader
+    result['launch_to_paint_s'] = result['first_paint_wall'] - launched
+    return result
+
+def import_profile(top):
+    """Prints the slowest modules imported by main.py, from -X importtime."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                          cwd=ROOT, capture_output=True, text=True)
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    for cumulative, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:8.1f} ms  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--exe", help="Packaged executable to launch instead of main.py")
+    parser.add_argument("--offscreen", action="store_true", help="Use QT_QPA_PLATFORM=offscreen")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--importtime", action="store_true", help="Show the slowest imports and exit")
+    parser.add_argument("--json", action="store_true", help="Print the raw results as JSON")
+    args = parser.parse_args()
+
+    if args.importtime:
+        import_profile(20)
+        return
+
+    env = dict(os.environ)
+    if args.offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    command = [args.exe] if args.exe else [sys.executable, os.path.join(ROOT, "main.py")]
+    # A scratch app data folder, so runs never touch the real history and state
+    with tempfile.TemporaryDirectory(prefix="timerapp-bench-") as data:
+        env["APPDATA"] = env["XDG_DATA_HOME"] = data
+        results = [run_once(command, env, args.timeout) for _ in range(args.runs)]
+
+    summary = {key: statistics.median(r[key] for r in results)
+               for key in ('import_s', 'first_paint_s', 'launch_to_paint_s')}
+    if args.json:
+        print(json.dumps({'runs': results, 'median': summary}, indent=2))
+        return
+    print(f"median of {args.runs} runs ({'exe' if args.exe else 'python'}):")
+    print(f"  import main.py        {summary['import_s'] * 1000:8.1f} ms")
+    print(f"  start to first paint  {summary['first_paint_s'] * 1000:8.1f} ms")
+    print(f"  launch to first paint {summary['launch_to_paint_s'] * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Microbenchmark of TimerEngine.get_current_time under each timezone backend.
+
+Run from the repository root:
+    python benchmarks/bench_timezone.py [--zone Europe/Berlin] [--number 200000]
+"""
+import os
+import sys
+import timeit
+import argparse
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from logic import TimerEngine, zoneinfo
+try:
+    import pytz
+except ImportError:
+    pytz = None
+
+def make_engine(backend, zone):
+    engine = TimerEngine(history_path=":memory:", tz_backend=backend)
+    engine.use_system_time = False
+    engine.timezone = zone
+    return engine
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--zone", default="Europe/Berlin")
+    parser.add_argument("--number", type=int, default=200000)
+    args = parser.parse_args()
+
+    cases = {"system time": lambda: TimerEngine(history_path=":memory:").get_current_time}
+    if pytz:
+        # What every tick paid before the resolved zone was cached
+        cases["pytz, lookup per call"] = lambda: (lambda: datetime.datetime.now(pytz.timezone(args.zone)))
+        cases["pytz, cached"] = lambda: make_engine("pytz", args.zone).get_current_time
+    if zoneinfo:
+        cases["zoneinfo, cached"] = lambda: make_engine("zoneinfo", args.zone).get_current_time
+
+    for name, factory in cases.items():
+        func = factory()
+        best = min(timeit.repeat(func, number=args.number, repeat=5))
+        print(f"{name:<24} {best / args.number * 1e9:8.0f} ns/call")
+
+if __name__ == "__main__":
+    main()
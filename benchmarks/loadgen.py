@@ -0,0 +1,260 @@
+"""Load generator and trace replay harness for TimerEngine.
+
+A trace is newline-delimited JSON: a header line with the settings that
+produced it, then one operation per line, ordered by its offset in seconds
+from the start ("t"). Each operation kind arrives as a Poisson process at
+its own rate, spread over `concurrency` named timers.
+
+Replay runs a trace against a fresh engine, either as fast as possible (on
+a VirtualClock that jumps to each operation's time, so timers expire exactly
+as the trace implies) or at real pace (on the monotonic clock, sleeping
+between operations). Before each operation the engine's due timers are
+processed, as the GUI tick does. The report gives throughput, p50/p99/max
+latency per operation and overall, and traced memory growth.
+
+Run from the repository root:
+    python benchmarks/loadgen.py generate --duration 600 --concurrency 200 -o trace.ndjson
+    python benchmarks/loadgen.py replay trace.ndjson [--real-time] [--journal]
+    python benchmarks/loadgen.py run --duration 600 --scale 10       # generate and replay in one go
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import platform
+import datetime
+import tracemalloc
+from array import array
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from clock import VirtualClock, MonotonicClock, to_ns
+from logic import TimerEngine
+
+# Operations per second in the default mix
+DEFAULT_RATES = {
+    'set_timer': 20.0,
+    'start_timer': 20.0,
+    'pause_timer': 5.0,
+    'reset_timer': 5.0,
+    'start_stopwatch': 1.0,
+    'stop_stopwatch': 0.5,
+    'lap_stopwatch': 10.0,
+    'log_history': 10.0,
+}
+TIMER_OPS = ('set_timer', 'start_timer', 'pause_timer', 'reset_timer')
+TIMER_SECONDS = (1, 5, 30, 60, 300, 1500) # Durations picked for set_timer
+
+# --- Generation ---
+
+def generate(duration, rates=None, concurrency=100, seed=0):
+    """Returns (header, ops) for `duration` seconds of load; ops are dicts ordered by 't'."""
+    rates = DEFAULT_RATES if rates is None else rates
+    rng = random.Random(seed)
+    ops = []
+    for op, rate in rates.items():
+        if rate <= 0:
+            continue
+        t = rng.expovariate(rate)
+        while t < duration:
+            ops.append({'t': round(t, 6), 'op': op})
+            t += rng.expovariate(rate)
+    ops.sort(key=lambda o: o['t'])
+
+    # Timer operations pick a name; an operation on a timer that was never
+    # set becomes its set_timer, so every trace replays without errors
+    names = [f"t{i}" for i in range(concurrency)]
+    known = set()
+    for o in ops:
+        if o['op'] in TIMER_OPS:
+            o['name'] = rng.choice(names)
+            if o['name'] not in known:
+                o['op'] = 'set_timer'
+            if o['op'] == 'set_timer':
+                o['seconds'] = rng.choice(TIMER_SECONDS)
+                known.add(o['name'])
+        elif o['op'] == 'log_history':
+            o['seconds'] = rng.choice(TIMER_SECONDS)
+    header = {'version': 1, 'duration': duration, 'concurrency': concurrency, 'seed': seed,
+              'rates': rates, 'ops': len(ops)}
+    return header, ops
+
+def write_trace(path, header, ops):
+    with open(path, "w") as f:
+        f.write(json.dumps(header) + "\n")
+        for o in ops:
+            f.write(json.dumps(o, separators=(",", ":")) + "\n")
+
+def read_trace(path):
+    with open(path) as f:
+        header = json.loads(f.readline())
+        return header, [json.loads(line) for line in f if line.strip()]
+
+# --- Replay ---
+
+def _call(engine, o):
+    op = o['op']
+    if op == 'set_timer':
+        engine.set_timer(o['seconds'], o['name'])
+    elif op in ('start_timer', 'pause_timer', 'reset_timer'):
+        getattr(engine, op)(o['name'])
+    elif op == 'log_history':
+        engine.log_history(o['seconds'])
+    else:
+        getattr(engine, op)()
+
+def percentiles(values):
+    """Nearest-rank p50, p99 and max of a sequence of nanosecond latencies."""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    n = len(ordered)
+    return {'count': n, 'p50_ns': ordered[(n - 1) // 2], 'p99_ns': ordered[min(n - 1, int(n * 0.99))],
+            'max_ns': ordered[-1]}
+
+def replay(ops, real_time=False, journal=False, memory=True):
+    """Replays ops against a fresh engine and returns the report dict."""
+    clock = MonotonicClock() if real_time else VirtualClock()
+    engine = TimerEngine(history_path=":memory:", clock=clock)
+    finished = [0]
+    def count_finished(event, data):
+        if event == 'timer_finished':
+            finished[0] += 1
+    engine.add_listener(count_finished)
+    state_journal = None
+    if journal:
+        from persistence import StateJournal
+        state_journal = StateJournal(engine, tempfile.mkdtemp(prefix="timerapp-loadgen-")).open()
+
+    latencies = {} # op -> array of ns
+    everything = array('q')
+    perf_ns = time.perf_counter_ns
+    if memory:
+        tracemalloc.start()
+        memory_start = tracemalloc.get_traced_memory()[0]
+    origin = clock.now_ns()
+    started = perf_ns()
+    for o in ops:
+        due = origin + to_ns(o['t'])
+        if real_time:
+            delay = due - clock.now_ns()
+            if delay > 0:
+                time.sleep(delay / 1e9)
+        else:
+            clock.set(due)
+        for name in ('update_timers', o['op']):
+            t0 = perf_ns()
+            if name == 'update_timers':
+                engine.update_timers()
+            else:
+                _call(engine, o)
+            elapsed = perf_ns() - t0
+            samples = latencies.get(name)
+            if samples is None:
+                samples = latencies[name] = array('q')
+            samples.append(elapsed)
+            if name != 'update_timers':
+                everything.append(elapsed)
+    wall_s = (perf_ns() - started) / 1e9
+
+    report = {
+        'pace': 'real' if real_time else 'fast',
+        'ops': len(ops),
+        'elapsed_s': round(wall_s, 6),
+        'throughput_ops_s': round(len(ops) / wall_s, 1) if wall_s else None,
+        'latency': {'all': percentiles(everything), **{op: percentiles(v) for op, v in sorted(latencies.items())}},
+        'engine': {'timers': len(engine.timers), 'running': engine.timers.running_count,
+                   'finished': finished[0], 'history': len(engine.history), 'laps': len(engine.stopwatch_laps)},
+    }
+    if memory:
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        report['memory'] = {'growth_bytes': current - memory_start, 'peak_bytes': peak - memory_start,
+                            'growth_per_op_bytes': round((current - memory_start) / len(ops), 1) if ops else 0}
+    if state_journal:
+        state_journal.close()
+    engine.close()
+    return report
+
+# --- Command line ---
+
+def parse_rate(text):
+    op, _, rate = text.partition("=")
+    if op not in DEFAULT_RATES:
+        raise argparse.ArgumentTypeError(f"unknown operation {op!r} (one of {', '.join(DEFAULT_RATES)})")
+    try:
+        return op, float(rate)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid rate: {text!r}")
+
+def add_generate_arguments(parser):
+    parser.add_argument("--duration", type=float, default=60, help="trace length in seconds")
+    parser.add_argument("--concurrency", type=int, default=100, help="number of named timers")
+    parser.add_argument("--rate", type=parse_rate, action="append", default=[], metavar="OP=PER_SECOND",
+                        help="override one operation's rate (repeatable)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every rate")
+    parser.add_argument("--seed", type=int, default=0)
+
+def add_replay_arguments(parser):
+    parser.add_argument("--real-time", action="store_true", help="replay at the trace's pace instead of flat out")
+    parser.add_argument("--journal", action="store_true", help="persist through a StateJournal, as the app does")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (it slows every operation)")
+    parser.add_argument("--output", help="write the report JSON here instead of stdout")
+
+def rates_from(args):
+    rates = dict(DEFAULT_RATES, **dict(args.rate))
+    return {op: rate * args.scale for op, rate in rates.items()}
+
+def report_json(header, report, args):
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': datetime.datetime.now().isoformat(timespec="seconds"),
+            'tracemalloc': not args.no_memory,
+        },
+        'trace': header,
+        **report,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    lat = report['latency']['all']
+    if lat['count']:
+        print(f"{report['ops']} ops in {report['elapsed_s']:.3f} s ({report['throughput_ops_s']:,.0f} ops/s), "
+              f"p50 {lat['p50_ns'] / 1000:.1f} us, p99 {lat['p99_ns'] / 1000:.1f} us", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    gen = commands.add_parser("generate", help="write a trace")
+    add_generate_arguments(gen)
+    gen.add_argument("-o", "--trace", required=True, help="trace file to write")
+    rep = commands.add_parser("replay", help="replay a trace")
+    rep.add_argument("trace")
+    add_replay_arguments(rep)
+    both = commands.add_parser("run", help="generate a trace and replay it")
+    add_generate_arguments(both)
+    add_replay_arguments(both)
+    args = parser.parse_args()
+
+    if args.command == "replay":
+        header, ops = read_trace(args.trace)
+    else:
+        header, ops = generate(args.duration, rates_from(args), args.concurrency, args.seed)
+        if args.command == "generate":
+            write_trace(args.trace, header, ops)
+            print(f"{len(ops)} ops over {args.duration:g} s written to {args.trace}", file=sys.stderr)
+            return 0
+    report_json(header, replay(ops, args.real_time, args.journal, not args.no_memory), args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""Benchmark suite for the engine and the UI hot paths, runnable headless.
+
+Results are printed as JSON and can be compared against a stored baseline;
+the exit status is 1 when any benchmark is slower than the baseline by more
+than the threshold. Benchmarks that take under a microsecond per call swing
+by tens of percent between identical runs, so they get a wider threshold (50%),
+and a benchmark over its threshold is re-run (--retries) before it counts
+as a regression, as a slowdown from a busy machine rarely repeats.
+
+Run from the repository root:
+    python benchmarks/run.py                                  # all benchmarks, JSON to stdout
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --baseline benchmarks/baseline.json
+    python benchmarks/run.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run.py --filter ui.tick --save-baseline benchmarks/baseline.json   # update matching entries only
+    python benchmarks/run.py --filter history --quick
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import platform
+import tempfile
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# name -> setup function returning (operation, number of calls per repeat)
+BENCHMARKS = {}
+
+FAST_NS = 1000 # Baselines below this many ns per call use the fast threshold
+
+def bench(name):
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return decorator
+
+_app = None
+_window = None
+
+def qt_app():
+    global _app
+    if _app is None:
+        from PyQt6.QtWidgets import QApplication
+        _app = QApplication.instance() or QApplication([])
+    return _app
+
+def main_window():
+    global _window
+    if _window is None:
+        qt_app()
+        import main
+        from logic import TimerEngine
+        _window = main.MainWindow(TimerEngine(history_path=":memory:"))
+        _window.show()
+        qt_app().processEvents()
+    return _window
+
+def history_db(entries):
+    """Returns the path of a scratch history database holding `entries` entries."""
+    from history import HistoryStore
+    path = os.path.join(tempfile.gettempdir(), f"timerapp-bench-history-{entries}.db")
+    store = HistoryStore(path, batch_size=100000)
+    if len(store) != entries:
+        store.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        store = HistoryStore(path, batch_size=100000)
+        start = datetime.datetime(2024, 1, 1)
+        for i in range(entries):
+            store.append(60 * (i % 90 + 1), start + datetime.timedelta(minutes=30 * i))
+    store.close()
+    return path
+
+# --- Engine ---
+
+@bench("engine.update_timer")
+def bench_update_timer():
+    from logic import TimerEngine
+    engine = TimerEngine(history_path=":memory:")
+    engine.set_timer(10 ** 6)
+    engine.start_timer()
+    return engine.update_timer, 100000
+
+@bench("engine.get_stopwatch_time")
+def bench_get_stopwatch_time():
+    from logic import TimerEngine
+    engine = TimerEngine(history_path=":memory:")
+    engine.start_stopwatch()
+    return engine.get_stopwatch_time, 200000
+
+@bench("engine.get_current_time.system")
+def bench_get_current_time_system():
+    from logic import TimerEngine
+    engine = TimerEngine(history_path=":memory:")
+    return engine.get_current_time, 100000
+
+@bench("engine.get_current_time.zone")
+def bench_get_current_time_zone():
+    from logic import TimerEngine
+    engine = TimerEngine(history_path=":memory:")
+    engine.use_system_time = False
+    engine.timezone = "America/New_York"
+    return engine.get_current_time, 100000
+
+# --- UI ---
+
+@bench("ui.format_time")
+def bench_format_time():
+    window = main_window()
+    values = [i * 0.37 for i in range(1000)]
+    def op():
+        for v in values:
+            window.format_time(v, True)
+    return op, 100
+
+@bench("format.durations.batch")
+def bench_format_durations():
+    from array import array
+    from timefmt import format_durations
+    values = array('d', (i * 0.37 for i in range(100000)))
+    return lambda: format_durations(values, True), 5
+
+@bench("format.stopwatch_display")
+def bench_stopwatch_display():
+    from timefmt import DurationDisplay
+    display = DurationDisplay(centiseconds=True)
+    values = [i * 0.001 for i in range(1000)] # 1 ms steps: most calls change nothing on screen
+    def op():
+        for v in values:
+            display.render(v)
+    return op, 100
+
+@bench("ui.tick")
+def bench_tick():
+    window = main_window()
+    window.engine.set_timer(10 ** 6)
+    window.engine.start_timer()
+    window.engine.start_stopwatch()
+    window.mode_btn.setChecked(True)
+    return window.tick, 5000
+
+@bench("ui.adjust_font.resize_storm")
+def bench_resize_storm():
+    window = main_window()
+    label = window.clock_display
+    sizes = [(200 + i % 40 * 5, 60 + i % 25 * 3) for i in range(100)]
+    def op():
+        for w, h in sizes:
+            label.resize(w, h)
+    return op, 20
+
+@bench("ui.theme_toggle")
+def bench_theme_toggle():
+    window = main_window()
+    def op():
+        window.toggle_theme()
+        qt_app().processEvents()
+    return op, 20
+
+@bench("ui.stopwatch_start_stop")
+def bench_stopwatch_start_stop():
+    window = main_window()
+    window.mode_btn.setChecked(True)
+    def op():
+        window.sw_start_stop()
+        qt_app().processEvents()
+        window.update_timer.stop() # Keep the running stopwatch's centisecond ticks out of the timing
+    return op, 200
+
+def bench_history_populate(entries):
+    def setup():
+        import main
+        from logic import TimerEngine
+        window = main_window()
+        engine = TimerEngine(history_path=history_db(entries))
+        dialog = main.HistoryDialog(engine, window)
+        def op():
+            dialog.populate()
+            dialog.list_view.doItemsLayout()
+        return op, 20
+    return setup
+
+for _entries, _label in ((10, "10"), (10000, "10k"), (1000000, "1M")):
+    bench(f"ui.history_populate.{_label}")(bench_history_populate(_entries))
+
+# --- Runner ---
+
+def run(name, repeat):
+    op, number = BENCHMARKS[name]()
+    op() # Warm-up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            op()
+        timings.append((time.perf_counter_ns() - start) / number)
+    return {
+        'ns_per_op_min': min(timings),
+        'ns_per_op_median': statistics.median(timings),
+        'number': number,
+        'repeat': repeat,
+    }
+
+def compare(results, baseline, threshold, fast_threshold):
+    """Returns a list of (name, ratio) for benchmarks slower than baseline * (1 + threshold).
+
+    `fast_threshold` replaces `threshold` for benchmarks whose baseline is under FAST_NS.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base:
+            continue
+        ratio = result['ns_per_op_min'] / base['ns_per_op_min']
+        result['baseline_ratio'] = round(ratio, 3)
+        if ratio > 1 + (fast_threshold if base['ns_per_op_min'] < FAST_NS else threshold):
+            regressions.append((name, ratio))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--quick", action="store_true", help="One repeat, for smoke testing")
+    parser.add_argument("--output", help="Write results JSON here instead of stdout")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--fast-threshold", type=float, default=0.5,
+                        help=f"Allowed slowdown for benchmarks under {FAST_NS} ns per call")
+    parser.add_argument("--retries", type=int, default=2, help="Re-runs of a benchmark over its threshold")
+    parser.add_argument("--save-baseline", help="Write the results as a new baseline")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    repeat = 1 if args.quick else args.repeat
+    results = {}
+    for name in names:
+        results[name] = run(name, repeat)
+        print(f"{name:<36} {results[name]['ns_per_op_min']:14.0f} ns/op", file=sys.stderr)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'qt_platform': os.environ.get("QT_QPA_PLATFORM"),
+            'date': datetime.datetime.now().isoformat(timespec="seconds"),
+        },
+        'results': results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.fast_threshold)
+        for _ in range(args.retries):
+            if not regressions:
+                break
+            for name, _ in regressions:
+                retry = run(name, repeat)
+                result = results[name]
+                if retry['ns_per_op_min'] < result['ns_per_op_min']:
+                    result['ns_per_op_min'] = retry['ns_per_op_min']
+                result['retries'] = result.get('retries', 0) + 1
+            regressions = compare({name: results[name] for name, _ in regressions}, baseline,
+                                  args.threshold, args.fast_threshold)
+        report['regressions'] = [name for name, _ in regressions]
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        if args.filter and os.path.exists(args.save_baseline):
+            # A filtered run replaces only its own entries
+            with open(args.save_baseline) as f:
+                saved = json.load(f)
+            saved['results'].update(results)
+            saved['meta'] = report['meta']
+            text = json.dumps(saved, indent=2)
+        with open(args.save_baseline, "w") as f:
+            f.write(text + "\n")
+
+    for name, ratio in regressions:
+        print(f"REGRESSION {name}: {ratio:.2f}x baseline", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,21 +12,23 @@ if exist TimerApp.spec del /q TimerApp.spec
 echo.
 
 REM Build the executable
+REM --onedir avoids unpacking the whole bundle to a temp folder on every launch
+REM (the main cost of starting a --onefile build), and --noupx avoids
+REM decompressing the Qt DLLs at load time.
 echo Building executable with PyInstaller...
-pyinstaller --onefile --windowed --name "TimerApp" main.py
+pyinstaller --onedir --windowed --noupx --exclude-module tkinter --name "TimerApp" main.py
 echo.
 
 REM Check if build was successful
-if exist dist\TimerApp.exe (
+if exist dist\TimerApp\TimerApp.exe (
     echo ========================================
     echo Build Successful!
     echo ========================================
     echo.
-    echo Executable location: dist\TimerApp.exe
-    echo File size:
-    dir dist\TimerApp.exe | find "TimerApp.exe"
+    echo Executable location: dist\TimerApp\TimerApp.exe
     echo.
-    echo You can now run: dist\TimerApp.exe
+    echo You can now run: dist\TimerApp\TimerApp.exe
+    echo Measure startup with: python benchmarks\bench_startup.py --exe dist\TimerApp\TimerApp.exe
 ) else (
     echo ========================================
     echo Build Failed!
@@ -0,0 +1,43 @@
+import time
+
+NS_PER_SECOND = 1_000_000_000
+
+def to_ns(seconds):
+    return round(seconds * NS_PER_SECOND)
+
+def to_seconds(ns):
+    return ns / NS_PER_SECOND
+
+class MonotonicClock:
+    """Default clock: time.monotonic_ns, unaffected by NTP slews or manual clock changes."""
+
+    def now_ns(self):
+        return time.monotonic_ns()
+
+class PerfCounterClock:
+    """Highest-resolution monotonic clock (time.perf_counter_ns)."""
+
+    def now_ns(self):
+        return time.perf_counter_ns()
+
+class VirtualClock:
+    """Clock that only moves when told to, for deterministic tests and simulations."""
+
+    def __init__(self, start_ns=0):
+        self.ns = start_ns
+
+    def now_ns(self):
+        return self.ns
+
+    def advance(self, seconds=0, ns=0):
+        self.ns += to_ns(seconds) + ns
+        return self.ns
+
+    def set(self, ns):
+        self.ns = ns
+
+class WallClock:
+    """System time (time.time_ns): nanoseconds since the Unix epoch. Jumps when the clock is changed."""
+
+    def now_ns(self):
+        return time.time_ns()
@@ -0,0 +1,332 @@
+"""Local control server: newline-delimited JSON commands for automation scripts.
+
+Each request line is a JSON object, or a JSON list of objects run as one
+batch; the response line has the same shape:
+
+    -> {"id": 1, "cmd": "set_timer", "name": "tea", "seconds": 180}
+    <- {"id": 1, "ok": true, "result": null}
+    -> [{"cmd": "start_timer", "name": "tea"}, {"cmd": "get_timer", "name": "tea"}]
+    <- [{"ok": true, "result": null}, {"ok": true, "result": {"name": "tea", ...}}]
+    -> {"cmd": "subscribe", "events": ["timer_finished"]}
+    <- {"ok": true, "result": null}
+    <- {"event": "timer_finished", "data": {"name": "tea", "duration": 180}}
+
+Listens on a Unix domain socket where available, else on 127.0.0.1.
+"""
+import os
+import sys
+import json
+import socket
+import asyncio
+import collections
+import datetime
+import threading
+import concurrent.futures
+from paths import app_data_path
+from logic import DEFAULT_TIMER
+
+DEFAULT_PORT = 47600
+MAX_QUEUED_EVENTS = 1000 # Per subscriber; older events are dropped beyond this
+BACKLOG = 1024 # Pending connections, for bursts of clients
+MAX_LINE = 16 * 1024 * 1024 # Longest request line, in bytes; bulk batches are one line
+
+class CommandError(Exception):
+    pass
+
+def _call_direct(func):
+    future = concurrent.futures.Future()
+    try:
+        future.set_result(func())
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def _json_default(obj):
+    if isinstance(obj, datetime.datetime):
+        return obj.isoformat()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+def encode(obj):
+    return (json.dumps(obj, default=_json_default) + "\n").encode()
+
+class ControlServer:
+    """Serves the control protocol from its own asyncio thread.
+
+    Engine work is handed to `call(func) -> concurrent.futures.Future`, which
+    must run `func` on the thread that owns the engine (the GUI passes a Qt
+    invoker). Without one, commands run on the server thread, which is only
+    safe when nothing else drives the engine. A batch is a single call, so it costs one round trip and no
+    other command runs in the middle of it. Clients never wait on each other.
+    """
+
+    def __init__(self, engine, path=None, port=None, call=None):
+        self.engine = engine
+        self.path = path
+        self.port = port
+        self.call = call or _call_direct
+        self.loop = None
+        self.server = None
+        self.subscribers = set() # (queue, event names or None)
+        self.commands = {
+            'set_timer': lambda name, seconds: engine.set_timer(seconds, name),
+            'start_timer': lambda name=DEFAULT_TIMER: engine.start_timer(name),
+            'pause_timer': lambda name=DEFAULT_TIMER: engine.pause_timer(name),
+            'reset_timer': lambda name=DEFAULT_TIMER: engine.reset_timer(name),
+            'remove_timer': lambda name: engine.remove_timer(name),
+            'get_timer': lambda name=DEFAULT_TIMER: self._timer_state(name),
+            'list_timers': lambda: [self._timer_state(name) for name in engine.timers.timers],
+            'start_stopwatch': engine.start_stopwatch,
+            'stop_stopwatch': engine.stop_stopwatch,
+            'reset_stopwatch': engine.reset_stopwatch,
+            'lap_stopwatch': engine.lap_stopwatch,
+            'get_stopwatch': self._stopwatch_state,
+            'set_schedule': lambda name, **spec: engine.set_schedule(name, spec),
+            'remove_schedule': lambda name: engine.remove_schedule(name),
+            'list_schedules': lambda: [engine.schedule_state(name) for name in engine.schedules.schedules],
+            'history': lambda offset=0, limit=100: engine.history.page(offset, limit),
+            'history_count': lambda: len(engine.history),
+            'history_stats': lambda: engine.analytics.summary(),
+        }
+
+    # --- Lifecycle ---
+    def start(self):
+        """Starts serving from a daemon thread; returns once listening."""
+        ready = threading.Event()
+        errors = []
+        def run():
+            self.loop = asyncio.new_event_loop()
+            try:
+                self.loop.run_until_complete(self._listen())
+            except Exception as e:
+                errors.append(e)
+                ready.set()
+                return
+            self.engine.add_listener(self._on_engine_event)
+            ready.set()
+            self.loop.run_forever()
+        threading.Thread(target=run, name="ControlServer", daemon=True).start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop(self):
+        if self.loop is not None:
+            self.engine.remove_listener(self._on_engine_event)
+            self.loop.call_soon_threadsafe(self.server.close)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    async def _listen(self):
+        if self.port is None and hasattr(socket, "AF_UNIX"):
+            self.path = self.path or app_data_path("control.sock")
+            # A stale socket from a crashed run would block the bind
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.server = await asyncio.start_unix_server(self._serve_client, self.path, backlog=BACKLOG,
+                                                          limit=MAX_LINE)
+        else:
+            self.port = self.port or DEFAULT_PORT
+            self.server = await asyncio.start_server(self._serve_client, "127.0.0.1", self.port, backlog=BACKLOG,
+                                                     limit=MAX_LINE)
+
+    @staticmethod
+    async def _read_line(reader):
+        """Returns the next line (b"" at EOF), or None for a line over MAX_LINE, which is skipped."""
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+        except asyncio.LimitOverrunError as e:
+            consumed = e.consumed
+        while True:
+            await reader.read(consumed) # Discard the line up to its end
+            try:
+                await reader.readuntil(b"\n")
+                return None
+            except asyncio.IncompleteReadError:
+                return None
+            except asyncio.LimitOverrunError as e:
+                consumed = e.consumed
+
+    # --- Clients ---
+    async def _serve_client(self, reader, writer):
+        queue = asyncio.Queue(MAX_QUEUED_EVENTS)
+        sender = asyncio.ensure_future(self._send_events(queue, writer))
+        subscription = None
+        try:
+            while True:
+                line = await self._read_line(reader)
+                if line is None:
+                    writer.write(encode({'ok': False, 'error': f"request line longer than {MAX_LINE} bytes"}))
+                    continue
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError as e:
+                    writer.write(encode({'ok': False, 'error': f"invalid JSON: {e}"}))
+                    continue
+                batch = request if isinstance(request, list) else [request]
+                # Subscriptions are handled here; everything else runs on the engine thread
+                plain = []
+                for cmd in batch:
+                    if isinstance(cmd, dict) and cmd.get('cmd') in ('subscribe', 'unsubscribe'):
+                        if subscription is not None:
+                            self.subscribers.discard(subscription)
+                            subscription = None
+                        if cmd['cmd'] == 'subscribe':
+                            events = cmd.get('events')
+                            subscription = (queue, frozenset(events) if events else None)
+                            self.subscribers.add(subscription)
+                    else:
+                        plain.append(cmd)
+                results = iter(await asyncio.wrap_future(self.call(lambda: [self._execute(c) for c in plain]))
+                               if plain else ())
+                responses = []
+                for cmd in batch:
+                    if isinstance(cmd, dict) and cmd.get('cmd') in ('subscribe', 'unsubscribe'):
+                        response = {'ok': True, 'result': None}
+                        if 'id' in cmd:
+                            response['id'] = cmd['id']
+                    else:
+                        response = next(results)
+                    responses.append(response)
+                writer.write(encode(responses if isinstance(request, list) else responses[0]))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if subscription is not None:
+                self.subscribers.discard(subscription)
+            sender.cancel()
+            writer.close()
+
+    async def _send_events(self, queue, writer):
+        while True:
+            message = await queue.get()
+            writer.write(message)
+            await writer.drain()
+
+    def _execute(self, cmd):
+        """Runs one command on the engine thread and returns its response."""
+        response = {}
+        try:
+            if not isinstance(cmd, dict):
+                raise CommandError("command must be a JSON object")
+            if 'id' in cmd:
+                response['id'] = cmd['id']
+            args = {k: v for k, v in cmd.items() if k not in ('id', 'cmd')}
+            handler = self.commands.get(cmd.get('cmd'))
+            if handler is None:
+                raise CommandError(f"unknown command: {cmd.get('cmd')!r}")
+            response['ok'] = True
+            response['result'] = handler(**args)
+        except KeyError as e:
+            response['ok'] = False
+            response['error'] = f"no such timer: {e}"
+        except Exception as e:
+            response['ok'] = False
+            response['error'] = str(e)
+        return response
+
+    # --- Engine side ---
+    def _timer_state(self, name):
+        cd = self.engine.timers.get(name)
+        return {'name': name, 'duration': cd.duration, 'remaining': self.engine.timers.remaining(name),
+                'running': cd.running}
+
+    def _stopwatch_state(self):
+        laps = self.engine.stopwatch_laps
+        return {'running': self.engine.stopwatch_running, 'time': self.engine.get_stopwatch_time(),
+                'laps': len(laps), 'best': laps.best, 'worst': laps.worst, 'mean': laps.mean}
+
+    def _on_engine_event(self, event, data):
+        # Called on the engine thread; encoded once and fanned out on the server loop
+        if self.subscribers:
+            message = encode({'event': event, 'data': data})
+            self.loop.call_soon_threadsafe(self._publish, event, message)
+
+    def _publish(self, event, message):
+        for queue, events in self.subscribers:
+            if events is None or event in events:
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(message)
+
+class ControlClient:
+    """Blocking client for scripts."""
+
+    def __init__(self, path=None, port=None, timeout=5.0):
+        if port is None and hasattr(socket, "AF_UNIX"):
+            self.sock = socket.socket(socket.AF_UNIX)
+            self.sock.settimeout(timeout)
+            self.sock.connect(path or app_data_path("control.sock"))
+        else:
+            self.sock = socket.create_connection(("127.0.0.1", port or DEFAULT_PORT), timeout)
+        self.file = self.sock.makefile("rb")
+        self.pending_events = collections.deque() # Events that arrived ahead of a response
+
+    def send(self, request):
+        """Sends a command dict or a list of them and returns the response."""
+        self.sock.sendall(encode(request))
+        return self.read()
+
+    def request(self, cmd, **args):
+        response = self.send(dict(args, cmd=cmd))
+        if not response.get('ok'):
+            raise CommandError(response.get('error'))
+        return response.get('result')
+
+    def read(self):
+        """Returns the next response, keeping event lines read on the way for events()."""
+        while True:
+            message = self._read_message()
+            if isinstance(message, dict) and 'event' in message:
+                self.pending_events.append(message)
+            else:
+                return message
+
+    def _read_message(self):
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("control server closed the connection")
+        return json.loads(line)
+
+    def events(self, *names):
+        """Subscribes and yields (event, data) until the connection closes."""
+        self.request('subscribe', events=list(names) or None)
+        self.sock.settimeout(None)
+        while True:
+            message = self.pending_events.popleft() if self.pending_events else self._read_message()
+            if 'event' in message:
+                yield message['event'], message['data']
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+def main(argv=None):
+    """Sends each argument as a request line and prints the responses."""
+    import argparse
+    parser = argparse.ArgumentParser(prog="python -m control", description="Send commands to a running TimerApp.")
+    parser.add_argument("requests", nargs="*", help='JSON requests, e.g. \'{"cmd": "list_timers"}\'')
+    parser.add_argument("--port", type=int, help="connect over TCP instead of the Unix socket")
+    parser.add_argument("--watch", nargs="*", metavar="EVENT", help="stream events after the requests")
+    args = parser.parse_args(argv)
+    client = ControlClient(port=args.port)
+    for text in args.requests:
+        print(json.dumps(client.send(json.loads(text))))
+    if args.watch is not None:
+        try:
+            for event, data in client.events(*args.watch):
+                print(json.dumps({'event': event, 'data': data}, default=_json_default), flush=True)
+        except KeyboardInterrupt:
+            pass
+    client.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
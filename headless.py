@@ -0,0 +1,232 @@
+"""Asyncio front end for TimerEngine, and a command-line timer runner.
+
+    python -m headless 25m                  # one countdown
+    python -m headless focus=25m break=5m   # several named countdowns at once
+    python -m headless --stopwatch 10       # stream the stopwatch for 10 seconds
+"""
+import re
+import sys
+import asyncio
+import argparse
+from logic import TimerEngine
+from clock import to_seconds
+from timefmt import format_duration
+
+class AsyncTimerEngine:
+    """Drives a TimerEngine from an asyncio loop instead of the Qt tick().
+
+    One driver task sleeps until the engine's next deadline and wakes early
+    only when timers change, so thousands of countdowns cost no polling.
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine or TimerEngine()
+        self._waiters = {} # name -> futures resolved on 'timer_finished', 'timer_reset' or 'timer_removed'
+        self._lap_queues = set()
+        self._changed = asyncio.Event()
+        self._driver = None
+        self.engine.add_listener(self._on_event)
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    def start(self):
+        if self._driver is None:
+            self._driver = asyncio.ensure_future(self._drive())
+
+    async def stop(self):
+        if self._driver is not None:
+            self._driver.cancel()
+            try:
+                await self._driver
+            except asyncio.CancelledError:
+                pass
+            self._driver = None
+        self.engine.remove_listener(self._on_event)
+
+    # --- Timers ---
+    def set_timer(self, name, seconds):
+        self.engine.set_timer(seconds, name)
+
+    def start_timer(self, name):
+        self.engine.start_timer(name)
+
+    def pause_timer(self, name):
+        self.engine.pause_timer(name)
+
+    def reset_timer(self, name):
+        self.engine.reset_timer(name)
+
+    def remaining(self, name):
+        return self.engine.timers.remaining(name)
+
+    async def wait_finished(self, name):
+        """Waits until the countdown `name` finishes and returns True.
+
+        Returns False if the countdown has no duration, or is reset or removed first.
+        """
+        cd = self.engine.timers.get(name)
+        if cd.duration_ns <= 0:
+            return False
+        if not cd.running and cd.remaining_ns == 0:
+            return True
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(name, []).append(future)
+        return await future
+
+    # --- Stopwatch ---
+    def start_stopwatch(self):
+        self.engine.start_stopwatch()
+
+    def stop_stopwatch(self):
+        self.engine.stop_stopwatch()
+
+    def reset_stopwatch(self):
+        self.engine.reset_stopwatch()
+
+    def lap(self):
+        return self.engine.lap_stopwatch()
+
+    async def stopwatch_updates(self, interval=0.01):
+        """Yields the stopwatch time each time it crosses a multiple of `interval` seconds."""
+        while True:
+            t = self.engine.get_stopwatch_time()
+            yield t
+            if self.engine.stopwatch_running:
+                await asyncio.sleep(interval - t % interval)
+            else:
+                await self._next_change()
+
+    async def laps(self):
+        """Yields {'index', 'time', 'split'} for every lap taken from now on."""
+        queue = asyncio.Queue()
+        self._lap_queues.add(queue)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._lap_queues.discard(queue)
+
+    # --- Internals ---
+    def _on_event(self, event, data):
+        if event in ('timer_finished', 'timer_reset', 'timer_removed'):
+            for future in self._waiters.pop(data['name'], ()):
+                if not future.done():
+                    future.set_result(event == 'timer_finished')
+        elif event == 'lap':
+            for queue in self._lap_queues:
+                queue.put_nowait(data)
+        self._changed.set()
+
+    async def _next_change(self):
+        self._changed.clear()
+        await self._changed.wait()
+
+    async def _drive(self):
+        engine = self.engine
+        while True:
+            engine.update_timers()
+            deadline = engine.next_deadline()
+            self._changed.clear()
+            timeout = None if deadline is None else max(to_seconds(deadline - engine.clock.now_ns()), 0)
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+# --- Command line ---
+
+DURATION_RE = re.compile(r"^(?:(\d+)h)?(?:(\d+)m)?(?:(\d+(?:\.\d+)?)s?)?$")
+
+def parse_duration(text):
+    """Parses '90', '90s', '25m', '1h30m', '5m30s' or '[h:]mm:ss' into seconds."""
+    if ":" in text:
+        seconds = 0
+        for part in text.split(":"):
+            seconds = seconds * 60 + float(part)
+    else:
+        match = DURATION_RE.match(text)
+        if not text or not match:
+            raise argparse.ArgumentTypeError(f"invalid duration: {text!r}")
+        hours, minutes, seconds = match.groups()
+        seconds = int(hours or 0) * 3600 + int(minutes or 0) * 60 + float(seconds or 0)
+    if not seconds > 0: # Also rejects NaN
+        raise argparse.ArgumentTypeError(f"duration must be positive: {text!r}")
+    return seconds
+
+def parse_timer(text):
+    """Parses '[NAME=]DURATION' into (name or None, seconds)."""
+    name, _, duration = text.rpartition("=")
+    return name or None, parse_duration(duration)
+
+async def run_timers(aengine, timers, quiet):
+    for name, seconds in timers:
+        if seconds <= 0:
+            raise ValueError(f"{name}: duration must be positive")
+    for name, seconds in timers:
+        aengine.set_timer(name, seconds)
+        aengine.start_timer(name)
+
+    async def report(name):
+        if await aengine.wait_finished(name):
+            print(f"{name}: finished\a", flush=True)
+        else:
+            print(f"{name}: stopped", flush=True)
+
+    async def progress():
+        while True:
+            line = "  ".join(f"{name} {format_duration(aengine.remaining(name))}" for name, _ in timers)
+            print(f"\r{line}", end="", file=sys.stderr, flush=True)
+            await asyncio.sleep(1)
+
+    ticker = None if quiet else asyncio.ensure_future(progress())
+    await asyncio.gather(*(report(name) for name, _ in timers))
+    if ticker:
+        ticker.cancel()
+
+async def run_stopwatch(aengine, seconds, interval):
+    aengine.start_stopwatch()
+    async def stream():
+        async for t in aengine.stopwatch_updates(interval):
+            print(f"\r{t:10.2f}", end="", flush=True)
+    task = asyncio.ensure_future(stream())
+    await asyncio.sleep(seconds)
+    task.cancel()
+    aengine.stop_stopwatch()
+    print(f"\r{aengine.engine.get_stopwatch_time():10.2f}")
+
+async def run(args):
+    engine = TimerEngine(history_path=":memory:" if args.no_history else None)
+    async with AsyncTimerEngine(engine) as aengine:
+        if args.stopwatch is not None:
+            await run_stopwatch(aengine, args.stopwatch, args.interval)
+        else:
+            # Unnamed timers are numbered so several can share a command line
+            timers = [(name or f"timer{i + 1}", seconds) for i, (name, seconds) in enumerate(args.timers)]
+            await run_timers(aengine, timers, args.quiet)
+    engine.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m headless", description="Run timers without a GUI.")
+    parser.add_argument("timers", nargs="*", type=parse_timer, metavar="[NAME=]DURATION",
+                        help="countdowns to run, e.g. 25m, focus=25m, 1h30m, 5:00")
+    parser.add_argument("--stopwatch", type=parse_duration, metavar="DURATION",
+                        help="run the stopwatch for DURATION and stream its time")
+    parser.add_argument("--interval", type=float, default=0.01, help="stopwatch update interval in seconds")
+    parser.add_argument("--quiet", action="store_true", help="only print when timers finish")
+    parser.add_argument("--no-history", action="store_true", help="do not log finished timers to history")
+    args = parser.parse_args(argv)
+    if not args.timers and args.stopwatch is None:
+        parser.error("give at least one timer or --stopwatch")
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 130
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
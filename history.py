@@ -0,0 +1,143 @@
+import sqlite3
+import threading
+import datetime
+from paths import app_data_path
+
+class HistoryStore:
+    """Append-only history of completed timers, kept in SQLite.
+
+    An entry appended while nothing else is buffered is written at once;
+    entries that arrive behind it are buffered and written in batches, at
+    the latest `flush_interval` seconds later by a background timer. Every
+    read flushes the buffer first. Entries get consecutive ids starting at 1, so newest-first pages are
+    plain id ranges and never scan the table. Safe to use from several threads.
+    """
+
+    def __init__(self, path=None, batch_size=32, flush_interval=5.0):
+        self.path = path or app_data_path("history.db")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval # seconds an entry may stay buffered
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS history (
+                                 id INTEGER PRIMARY KEY,
+                                 duration NUMERIC NOT NULL,
+                                 timestamp REAL NOT NULL)""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS history_timestamp ON history(timestamp)")
+        self.conn.commit()
+        self.last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM history").fetchone()[0]
+        self._pending = []
+        self._flush_timer = None
+
+    def __len__(self):
+        return self.last_id
+
+    def append(self, duration, timestamp):
+        """Adds an entry and returns it as a dict."""
+        with self.lock:
+            self.last_id += 1
+            entry_id = self.last_id
+            self._pending.append((entry_id, duration, timestamp.timestamp()))
+            if len(self._pending) == 1 and self._flush_timer is None:
+                self.flush() # Nothing buffered ahead of it: write now
+                self._flush_timer = self._start_timer() # Entries in the next interval wait for it
+            elif len(self._pending) >= self.batch_size:
+                self.flush()
+        return {'id': entry_id, 'duration': duration, 'timestamp': timestamp}
+
+    def flush(self):
+        with self.lock:
+            if self._pending:
+                with self.conn:
+                    self.conn.executemany("INSERT INTO history VALUES (?, ?, ?)", self._pending)
+                self._pending = []
+
+    def _start_timer(self):
+        timer = threading.Timer(self.flush_interval, self._on_timer)
+        timer.daemon = True
+        timer.start()
+        return timer
+
+    def _on_timer(self):
+        with self.lock:
+            if self.conn is None:
+                return
+            if self._pending:
+                self.flush()
+                self._flush_timer = self._start_timer()
+            else:
+                self._flush_timer = None
+
+    def get(self, entry_id):
+        rows = self._query("WHERE id = ?", (entry_id,))
+        return rows[0] if rows else None
+
+    def count(self, **filters):
+        """Returns the number of entries matching the filters (see `matches`)."""
+        if not any(v is not None for v in filters.values()):
+            return self.last_id
+        where, params = self._where(**filters)
+        with self.lock:
+            self.flush()
+            return self.conn.execute("SELECT COUNT(*) FROM history " + where, params).fetchone()[0]
+
+    def page(self, offset, limit, **filters):
+        """Returns up to `limit` matching entries, newest first, skipping the `offset` newest."""
+        if not any(v is not None for v in filters.values()):
+            high = self.last_id - offset
+            low = max(high - limit, 0)
+            return self._query("WHERE id > ? AND id <= ? ORDER BY id DESC", (low, high))
+        where, params = self._where(**filters)
+        return self._query(where + " ORDER BY id DESC LIMIT ? OFFSET ?", params + [limit, offset])
+
+    @staticmethod
+    def matches(entry, start=None, end=None, min_duration=None, max_duration=None):
+        """Checks an entry against the filters: start <= timestamp < end, min <= duration <= max."""
+        ts, duration = entry['timestamp'], entry['duration']
+        return ((start is None or ts >= start) and (end is None or ts < end)
+                and (min_duration is None or duration >= min_duration)
+                and (max_duration is None or duration <= max_duration))
+
+    def range(self, start=None, end=None, limit=-1):
+        """Returns entries with start <= timestamp < end, oldest first."""
+        start = start.timestamp() if start else float("-inf")
+        end = end.timestamp() if end else float("inf")
+        return self._query("WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp LIMIT ?",
+                           (start, end, limit))
+
+    def close(self):
+        with self.lock:
+            if self.conn is None:
+                return
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self.flush()
+            self.conn.close()
+            self.conn = None
+
+    @staticmethod
+    def _where(start=None, end=None, min_duration=None, max_duration=None):
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("timestamp >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            conditions.append("timestamp < ?")
+            params.append(end.timestamp())
+        if min_duration is not None:
+            conditions.append("duration >= ?")
+            params.append(min_duration)
+        if max_duration is not None:
+            conditions.append("duration <= ?")
+            params.append(max_duration)
+        return ("WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+    def _query(self, clause, params):
+        with self.lock:
+            self.flush()
+            rows = self.conn.execute("SELECT id, duration, timestamp FROM history " + clause, params).fetchall()
+        return [{'id': entry_id,
+                 'duration': duration,
+                 'timestamp': datetime.datetime.fromtimestamp(ts)} for entry_id, duration, ts in rows]
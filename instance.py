@@ -0,0 +1,78 @@
+import json
+import time
+import getpass
+from PyQt6.QtCore import QObject, QLockFile, pyqtSignal
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+from paths import app_data_path
+
+CONNECT_TIMEOUT_MS = 500
+FORWARD_ATTEMPTS = 10 # The first instance may still be starting its server
+RETRY_DELAY_S = 0.05 # Doubles after each failed attempt, up to MAX_RETRY_DELAY_S
+MAX_RETRY_DELAY_S = 1.0
+
+class SingleInstance(QObject):
+    """Keeps one TimerApp per user; later launches hand their arguments to it.
+
+    The first instance holds a lock file in the app data folder and listens
+    on a local socket (a named pipe on Windows). A later launch fails to
+    take the lock, sends its command line as one JSON line and exits.
+    """
+    arguments_received = pyqtSignal(list)
+
+    def __init__(self, name=None, parent=None):
+        super().__init__(parent)
+        self.name = name or f"TimerApp-{getpass.getuser()}"
+        self.lock = QLockFile(app_data_path("instance.lock"))
+        self.lock.setStaleLockTime(0) # Only a dead owner's lock is stale
+        self.server = None
+
+    def acquire(self):
+        """Returns True if this is the first instance; it then starts listening."""
+        if not self.lock.tryLock(0):
+            return False
+        QLocalServer.removeServer(self.name) # Left behind by a crashed instance
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self.accept)
+        if not self.server.listen(self.name):
+            print(f"Instance server failed: {self.server.errorString()}")
+        return True
+
+    def forward(self, arguments):
+        """Sends arguments to the first instance; returns True once delivered."""
+        message = (json.dumps(list(arguments)) + "\n").encode()
+        delay = RETRY_DELAY_S
+        for attempt in range(FORWARD_ATTEMPTS):
+            if attempt:
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY_S)
+            socket = QLocalSocket()
+            socket.connectToServer(self.name)
+            if socket.waitForConnected(CONNECT_TIMEOUT_MS):
+                socket.write(message)
+                delivered = socket.waitForBytesWritten(CONNECT_TIMEOUT_MS)
+                socket.disconnectFromServer()
+                return delivered
+        return False
+
+    def accept(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda s=socket: self.read(s))
+            socket.disconnected.connect(socket.deleteLater)
+            self.read(socket) # Data that arrived with the connection
+
+    def read(self, socket):
+        while socket.canReadLine():
+            try:
+                arguments = json.loads(bytes(socket.readLine()).decode())
+            except ValueError as e:
+                print(f"Instance message failed: {e}")
+                continue
+            self.arguments_received.emit([str(a) for a in arguments])
+
+    def release(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        self.lock.unlock()
@@ -0,0 +1,75 @@
+import math
+from array import array
+
+class LapStore:
+    """Stopwatch lap times in compact double arrays, with running split statistics.
+
+    Indexing returns the stopwatch time at each lap, like the plain list it
+    replaces. Best, worst, mean and variance of the splits (time between laps)
+    are updated in O(1) per lap using Welford's method.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.times = array('d') # Stopwatch time at each lap
+        self.splits = array('d') # Time since the previous lap
+        self.best_index = None
+        self.worst_index = None
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def load(self, times):
+        """Replaces the laps with `times`, recomputing splits and statistics."""
+        self.clear()
+        for t in times:
+            self.append(t)
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, index):
+        return self.times[index]
+
+    def __iter__(self):
+        return iter(self.times)
+
+    def append(self, t):
+        split = t - self.times[-1] if self.times else t
+        self.times.append(t)
+        self.splits.append(split)
+        n = len(self.splits)
+        if self.best_index is None or split < self.splits[self.best_index]:
+            self.best_index = n - 1
+        if self.worst_index is None or split > self.splits[self.worst_index]:
+            self.worst_index = n - 1
+        delta = split - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (split - self._mean)
+        return split
+
+    @property
+    def best(self):
+        return None if self.best_index is None else self.splits[self.best_index]
+
+    @property
+    def worst(self):
+        return None if self.worst_index is None else self.splits[self.worst_index]
+
+    @property
+    def mean(self):
+        return self._mean if self.splits else None
+
+    @property
+    def variance(self):
+        """Sample variance of the splits (0 for a single lap)."""
+        n = len(self.splits)
+        if n == 0:
+            return None
+        return self._m2 / (n - 1) if n > 1 else 0.0
+
+    @property
+    def stdev(self):
+        variance = self.variance
+        return None if variance is None else math.sqrt(variance)
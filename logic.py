@@ -1,124 +1,462 @@
-import time
+import heapq
 import datetime
-import pytz
-import requests
+try:
+    import zoneinfo
+except ImportError:
+    zoneinfo = None
+# pytz is imported on first use to keep startup fast
 from collections import deque
+from history import HistoryStore
+from laps import LapStore
+from clock import MonotonicClock, WallClock, to_ns, to_seconds
+from metrics import REGISTRY
+from tzcatalog import get_catalog
+from recurrence import Scheduler, make_schedule
+
+DEFAULT_TIMER = "default"
+
+FINISH_ERROR = REGISTRY.histogram("timerapp_timer_finish_error_seconds",
+                                  "Time between a countdown's deadline and its completion being processed")
+TIMERS_FINISHED = REGISTRY.counter("timerapp_timers_finished_total", "Countdowns that ran to completion")
+
+class Countdown:
+    """State of a single named countdown. Times are integer nanoseconds of the engine clock."""
+    __slots__ = ('name', 'duration', 'duration_ns', 'remaining_ns', 'running', 'start_ns', 'deadline_ns', 'seq',
+                 'overdue_ns')
+
+    def __init__(self, name, duration):
+        self.name = name
+        self.duration = duration # As given, in seconds
+        self.duration_ns = to_ns(duration)
+        self.remaining_ns = self.duration_ns # Remaining time when last started/paused
+        self.running = False
+        self.start_ns = None
+        self.deadline_ns = None
+        self.seq = 0 # Identifies the live heap entry for this countdown
+        self.overdue_ns = 0 # How late the finish was processed
+
+    @property
+    def remaining(self):
+        """Remaining time in seconds when last started/paused."""
+        return to_seconds(self.remaining_ns)
+
+    def remaining_ns_at(self, now_ns):
+        if self.running:
+            return max(self.deadline_ns - now_ns, 0)
+        return self.remaining_ns
+
+class MultiTimerEngine:
+    """Runs many named countdowns, ordered by deadline in a min-heap.
+
+    Pausing or resetting a timer does not search the heap; its entry is left
+    behind and skipped when it reaches the top (lazy deletion).
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or MonotonicClock()
+        self.timers = {}
+        self._heap = [] # (deadline_ns, seq, name)
+        self._seq = 0
+        self._running = 0
+
+    def __len__(self):
+        return len(self.timers)
+
+    def __contains__(self, name):
+        return name in self.timers
+
+    def get(self, name):
+        return self.timers[name]
+
+    def set(self, name, seconds):
+        """Creates or replaces a stopped countdown."""
+        if name in self.timers:
+            self._stop(self.timers[name])
+        cd = Countdown(name, seconds)
+        self.timers[name] = cd
+        return cd
+
+    def remove(self, name):
+        cd = self.timers.pop(name, None)
+        if cd is not None:
+            self._stop(cd)
+
+    def start(self, name):
+        cd = self.timers[name]
+        if cd.running or cd.remaining_ns <= 0:
+            return False
+        now = self.clock.now_ns()
+        cd.start_ns = now
+        cd.deadline_ns = now + cd.remaining_ns
+        cd.running = True
+        self._running += 1
+        self._push(cd)
+        return True
+
+    def pause(self, name):
+        cd = self.timers[name]
+        if not cd.running:
+            return False
+        cd.remaining_ns = cd.remaining_ns_at(self.clock.now_ns())
+        self._stop(cd)
+        return True
+
+    def reset(self, name):
+        cd = self.timers[name]
+        self._stop(cd)
+        cd.remaining_ns = cd.duration_ns
+
+    def remaining(self, name):
+        """Remaining time of a countdown in seconds."""
+        return to_seconds(self.timers[name].remaining_ns_at(self.clock.now_ns()))
+
+    @property
+    def running_count(self):
+        return self._running
+
+    def next_deadline(self):
+        """Returns the earliest deadline (clock nanoseconds) of any running timer, or None."""
+        heap = self._heap
+        while heap:
+            deadline, seq, name = heap[0]
+            if self._is_live(deadline, seq, name):
+                return deadline
+            heapq.heappop(heap)
+        return None
+
+    def pop_expired(self, now_ns=None):
+        """Marks every timer whose deadline has passed as finished and returns them."""
+        if now_ns is None:
+            now_ns = self.clock.now_ns()
+        heap = self._heap
+        finished = []
+        while heap and heap[0][0] <= now_ns:
+            deadline, seq, name = heapq.heappop(heap)
+            if not self._is_live(deadline, seq, name):
+                continue
+            cd = self.timers[name]
+            cd.remaining_ns = 0
+            cd.overdue_ns = now_ns - deadline
+            self._stop(cd)
+            finished.append(cd)
+        return finished
+
+    def _is_live(self, deadline, seq, name):
+        cd = self.timers.get(name)
+        return cd is not None and cd.running and cd.seq == seq
+
+    def _push(self, cd):
+        self._seq += 1
+        cd.seq = self._seq
+        heapq.heappush(self._heap, (cd.deadline_ns, cd.seq, cd.name))
+        # Drop stale entries once they outnumber live ones
+        if len(self._heap) > 2 * self._running + 64:
+            self._heap = [e for e in self._heap if self._is_live(*e)]
+            heapq.heapify(self._heap)
+
+    def _stop(self, cd):
+        if cd.running:
+            cd.running = False
+            cd.deadline_ns = None
+            self._running -= 1
 
 class TimerEngine:
-    def __init__(self):
-        # Timer State
-        self.timer_duration = 0  # in seconds
-        self.timer_remaining = 0
-        self.timer_running = False
-        self.timer_start_time = None
-        self.timer_paused_at = 0 # Remaining time when paused
-
-        # Stopwatch State
+    def __init__(self, history_path=None, tz_backend=None, clock=None, wall_clock=None):
+        # Durations come from a monotonic clock (see clock.py); pass a
+        # VirtualClock to drive the engine by hand. Recurring schedules follow
+        # the wall clock.
+        self.clock = clock or MonotonicClock()
+        self.wall_clock = wall_clock or WallClock()
+
+        # Timer State (the single timer is the DEFAULT_TIMER countdown)
+        self.timers = MultiTimerEngine(self.clock)
+        self.timers.set(DEFAULT_TIMER, 0)
+
+        # Recurring timers (see recurrence.py)
+        self.schedules = Scheduler(self.wall_clock)
+
+        # Stopwatch State (clock nanoseconds)
         self.stopwatch_running = False
-        self.stopwatch_start_time = None
-        self.stopwatch_elapsed = 0 # Accumulated time before last start
-        self.stopwatch_laps = []
+        self.stopwatch_start_ns = None
+        self.stopwatch_elapsed_ns = 0 # Accumulated time before last start
+        self.stopwatch_laps = LapStore()
 
-        # History
-        self.history = [] # List of dicts: {'id': int, 'duration': int, 'timestamp': datetime}
-        self.history_counter = 1
+        # History (persistent; entries are dicts: {'id': int, 'duration': int, 'timestamp': datetime})
+        self.history = HistoryStore(history_path)
+        self._analytics = None # Columnar copy for statistics, loaded on first use
+
+        # Callables notified as listener(event, data) on every state change, e.g.
+        # ('timer_started', {'name': ...}), ('lap', {...}) or ('history', entry)
+        self.listeners = []
 
         # Settings
+        self._tz_backend = tz_backend or ("zoneinfo" if zoneinfo else "pytz")
         self.timezone = None # None means system time
         self.use_system_time = True
         self.time_format_24h = True
         
-        # Load timezones
-        self.available_timezones = pytz.all_timezones
-
-    def set_timer(self, seconds):
-        self.timer_duration = seconds
-        self.timer_remaining = seconds
-        self.timer_running = False
-        self.timer_paused_at = seconds
-
-    def start_timer(self):
-        if not self.timer_running and self.timer_remaining > 0:
-            self.timer_start_time = time.time()
-            self.timer_running = True
-
-    def pause_timer(self):
-        if self.timer_running:
-            elapsed = time.time() - self.timer_start_time
-            self.timer_remaining -= elapsed
-            self.timer_paused_at = self.timer_remaining
-            self.timer_running = False
-
-    def reset_timer(self):
-        self.timer_running = False
-        self.timer_remaining = self.timer_duration
-        self.timer_paused_at = self.timer_duration
+
+    # --- Single timer API (wraps the default countdown) ---
+    @property
+    def _default_timer(self):
+        return self.timers.get(DEFAULT_TIMER)
+
+    @property
+    def timer_duration(self):
+        return self._default_timer.duration
+
+    @property
+    def timer_remaining(self):
+        return self.timers.remaining(DEFAULT_TIMER)
+
+    @property
+    def timer_running(self):
+        return self._default_timer.running
+
+    @property
+    def timer_start_time(self):
+        return self._default_timer.start_ns
+
+    @property
+    def timer_paused_at(self):
+        return self._default_timer.remaining
+
+    # Timer methods act on the default countdown unless a name is given
+    def set_timer(self, seconds, name=DEFAULT_TIMER):
+        self.timers.set(name, seconds)
+        self.emit('timer_set', {'name': name, 'duration': seconds})
+
+    def start_timer(self, name=DEFAULT_TIMER):
+        if self.timers.start(name):
+            self.emit('timer_started', {'name': name})
+
+    def pause_timer(self, name=DEFAULT_TIMER):
+        if self.timers.pause(name):
+            self.emit('timer_paused', {'name': name, 'remaining': self.timers.get(name).remaining})
+
+    def reset_timer(self, name=DEFAULT_TIMER):
+        self.timers.reset(name)
+        self.emit('timer_reset', {'name': name})
+
+    def remove_timer(self, name):
+        if name != DEFAULT_TIMER and name in self.timers:
+            self.timers.remove(name)
+            self.emit('timer_removed', {'name': name})
+
+    def update_timers(self):
+        """Finishes every expired countdown, logs it and returns the finished timers.
+
+        Due schedules fire here too, as 'schedule_fired' events.
+        """
+        finished = self.timers.pop_expired()
+        for cd in finished:
+            FINISH_ERROR.observe(to_seconds(cd.overdue_ns))
+            TIMERS_FINISHED.inc()
+            self.emit('timer_finished', {'name': cd.name, 'duration': cd.duration})
+            self.log_history(cd.duration)
+        if self.schedules:
+            for name, scheduled_ns, missed in self.schedules.pop_due():
+                self.emit('schedule_fired', {'name': name, 'scheduled': to_seconds(scheduled_ns), 'missed': missed,
+                                             'next': to_seconds(self.schedules.next_ns[name])})
+        return finished
+
+    def next_deadline(self):
+        """Earliest countdown deadline or schedule occurrence, in engine clock nanoseconds, or None."""
+        deadline = self.timers.next_deadline()
+        fire = self.schedules.next_deadline()
+        if fire is not None:
+            fire = self.clock.now_ns() + (fire - self.wall_clock.now_ns())
+            if deadline is None or fire < deadline:
+                deadline = fire
+        return deadline
 
     def update_timer(self):
         """Updates and returns the remaining time."""
-        if self.timer_running:
-            elapsed = time.time() - self.timer_start_time
-            current_remaining = self.timer_paused_at - elapsed
-            if current_remaining <= 0:
-                self.timer_remaining = 0
-                self.timer_running = False
-                self.log_history(self.timer_duration)
-                return 0, True # Time, Finished
-            self.timer_remaining = current_remaining
-            return current_remaining, False
+        finished = self.update_timers()
+        if any(cd.name == DEFAULT_TIMER for cd in finished):
+            return 0, True # Time, Finished
         return self.timer_remaining, False
 
+    # --- Recurring timers ---
+    def set_schedule(self, name, spec):
+        """Adds or replaces a recurring timer, e.g. {'every': 1500} or {'at': '09:00', 'days': 'weekdays'}.
+
+        A calendar schedule without a 'zone' uses the selected time zone (or system time).
+        """
+        if 'at' in spec and 'zone' not in spec:
+            spec = dict(spec, zone=None if self.use_system_time else self.timezone)
+        self.schedules.add(name, make_schedule(spec, self.wall_clock.now_ns()))
+        self.emit('schedule_set', {'name': name})
+
+    def remove_schedule(self, name):
+        if name in self.schedules:
+            self.schedules.remove(name)
+            self.emit('schedule_removed', {'name': name})
+
+    def schedule_state(self, name):
+        return {'name': name, 'spec': self.schedules.get(name).spec, 'next_ns': self.schedules.next_ns[name]}
+
+    @property
+    def stopwatch_elapsed(self):
+        """Accumulated stopwatch time in seconds before the last start."""
+        return to_seconds(self.stopwatch_elapsed_ns)
+
     def start_stopwatch(self):
         if not self.stopwatch_running:
-            self.stopwatch_start_time = time.time()
+            self.stopwatch_start_ns = self.clock.now_ns()
             self.stopwatch_running = True
+            self.emit('stopwatch_started')
 
     def stop_stopwatch(self):
         if self.stopwatch_running:
-            elapsed_since_start = time.time() - self.stopwatch_start_time
-            self.stopwatch_elapsed += elapsed_since_start
+            elapsed_since_start = self.clock.now_ns() - self.stopwatch_start_ns
+            self.stopwatch_elapsed_ns += elapsed_since_start
             self.stopwatch_running = False
+            self.emit('stopwatch_stopped', {'elapsed': self.stopwatch_elapsed})
 
     def reset_stopwatch(self):
         self.stopwatch_running = False
-        self.stopwatch_elapsed = 0
-        self.stopwatch_laps = []
+        self.stopwatch_elapsed_ns = 0
+        self.stopwatch_laps.clear()
+        self.emit('stopwatch_reset')
 
     def lap_stopwatch(self):
         current_time = self.get_stopwatch_time()
-        self.stopwatch_laps.append(current_time)
+        split = self.stopwatch_laps.append(current_time)
+        self.emit('lap', {'index': len(self.stopwatch_laps), 'time': current_time, 'split': split})
         return current_time
 
-    def get_stopwatch_time(self):
+    def get_stopwatch_ns(self):
         if self.stopwatch_running:
-            return self.stopwatch_elapsed + (time.time() - self.stopwatch_start_time)
-        return self.stopwatch_elapsed
+            return self.stopwatch_elapsed_ns + (self.clock.now_ns() - self.stopwatch_start_ns)
+        return self.stopwatch_elapsed_ns
 
-    def log_history(self, duration):
-        entry = {
-            'id': self.history_counter,
-            'duration': duration,
-            'timestamp': datetime.datetime.now()
+    def get_stopwatch_time(self):
+        return to_seconds(self.get_stopwatch_ns())
+
+    # --- State export/restore (used by persistence.StateJournal) ---
+    # Running times are stored as of a wall-clock instant ('wall_ns') because
+    # the monotonic clock restarts with the machine.
+    def timer_state(self, name):
+        cd = self.timers.get(name)
+        return {'name': name, 'duration': cd.duration, 'running': cd.running,
+                'remaining_ns': cd.remaining_ns_at(self.clock.now_ns()), 'wall_ns': self.wall_clock.now_ns()}
+
+    def stopwatch_state(self):
+        return {'running': self.stopwatch_running, 'elapsed_ns': self.get_stopwatch_ns(), 'wall_ns': self.wall_clock.now_ns()}
+
+    def export_state(self):
+        """Returns timers, stopwatch and laps as a JSON-serializable dict."""
+        return {
+            'timers': [self.timer_state(name) for name in self.timers.timers],
+            'stopwatch': self.stopwatch_state(),
+            'laps': list(self.stopwatch_laps),
+            'schedules': [self.schedule_state(name) for name in self.schedules.schedules],
         }
-        self.history.append(entry)
-        self.history_counter += 1
 
-    def get_current_time(self):
-        if self.use_system_time or not self.timezone:
-            now = datetime.datetime.now()
-        else:
+    def restore_state(self, state):
+        """Restores an export_state() dict, advancing running times by the wall time since it was taken."""
+        now_wall = self.wall_clock.now_ns()
+        for t in state.get('timers', ()):
+            cd = self.timers.set(t['name'], t['duration'])
+            if t['running']:
+                # A timer that expired while the app was down finishes on the next update
+                cd.remaining_ns = max(t['remaining_ns'] - (now_wall - t['wall_ns']), 1)
+                self.timers.start(t['name'])
+            else:
+                cd.remaining_ns = t['remaining_ns']
+        sw = state.get('stopwatch')
+        if sw:
+            self.stopwatch_running = sw['running']
+            self.stopwatch_elapsed_ns = sw['elapsed_ns']
+            if sw['running']:
+                self.stopwatch_elapsed_ns += max(now_wall - sw['wall_ns'], 0)
+                self.stopwatch_start_ns = self.clock.now_ns()
+        self.stopwatch_laps.load(state.get('laps', ()))
+        for s in state.get('schedules', ()):
+            # Occurrences missed while the app was down fire once, on the next update
+            self.schedules.add(s['name'], make_schedule(s['spec']), s['next_ns'])
+        self.emit('restored')
+
+    @property
+    def history_counter(self):
+        return self.history.last_id + 1
+
+    @property
+    def analytics(self):
+        """HistoryAnalytics over the history (imports NumPy, so only on first use)."""
+        if self._analytics is None:
+            from analytics import HistoryAnalytics
+            self._analytics = HistoryAnalytics(self.history)
+        return self._analytics
+
+    def log_history(self, duration):
+        entry = self.history.append(duration, datetime.datetime.now())
+        if self._analytics is not None:
+            self._analytics.append(duration, entry['timestamp'])
+        self.emit('history', entry)
+        return entry
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def emit(self, event, data=None):
+        for listener in list(self.listeners):
+            listener(event, data)
+
+    def close(self):
+        self.history.close()
+
+    # --- Time zones ---
+    @property
+    def timezone(self):
+        return self._timezone
+
+    @timezone.setter
+    def timezone(self, name):
+        self._timezone = name
+        self._tz = None # Resolved again on the next get_current_time
+
+    @property
+    def tz_backend(self):
+        """Library used to resolve zones: "zoneinfo" (standard library) or "pytz"."""
+        return self._tz_backend
+
+    @tz_backend.setter
+    def tz_backend(self, backend):
+        self._tz_backend = backend
+        self._tz = None
+
+    @property
+    def available_timezones(self):
+        """Sorted zone names from the shared catalog (see tzcatalog.py), built on first use."""
+        return get_catalog().names
+
+    def resolve_timezone(self):
+        """Returns the tzinfo for the selected zone, or False if it is unknown."""
+        if self._tz is None:
             try:
-                tz = pytz.timezone(self.timezone)
-                now = datetime.datetime.now(tz)
-            except pytz.UnknownTimeZoneError:
-                now = datetime.datetime.now()
-        return now
-
-    def fetch_timezones(self):
-        """Tries to fetch timezones from web, falls back to pytz."""
-        try:
-            response = requests.get("http://worldtimeapi.org/api/timezone", timeout=2)
-            if response.status_code == 200:
-                self.available_timezones = response.json()
-        except Exception:
-            pass # Keep default pytz list
+                if self._tz_backend == "pytz":
+                    import pytz
+                    self._tz = pytz.timezone(self._timezone)
+                else:
+                    self._tz = zoneinfo.ZoneInfo(self._timezone)
+            except Exception:
+                self._tz = False
+        return self._tz
+
+    def get_current_time(self):
+        if self.use_system_time or not self._timezone:
+            return datetime.datetime.now()
+        tz = self._tz
+        if tz is None:
+            tz = self.resolve_timezone()
+        return datetime.datetime.now(tz) if tz else datetime.datetime.now()
+
+    def fetch_timezones(self, install=None):
+        """Revalidates the cached remote zone list if it is stale; returns True if it changed."""
+        return get_catalog().refresh(install=install)
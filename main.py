@@ -1,38 +1,247 @@
+import time
+_START = time.perf_counter() # Startup benchmark reference point
+import os
 import sys
+import json
+import math
 import threading
 import datetime
+import concurrent.futures
+from collections import OrderedDict
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QLabel, QStackedWidget, QComboBox, QCheckBox, 
-                             QDialog, QListWidget, QSpinBox, QFrame, QSizePolicy, QScrollArea)
-from PyQt6.QtCore import QTimer, Qt, QSize
-from PyQt6.QtGui import QFont, QAction, QIcon
-from logic import TimerEngine
-from plyer import notification
-try:
-    import winsound
-except ImportError:
-    winsound = None
+                             QDialog, QSpinBox, QFrame, QSizePolicy, QScrollArea,
+                             QListView, QGridLayout, QDateEdit, QLineEdit, QTabWidget)
+from PyQt6.QtCore import (QTimer, Qt, QSize, QAbstractListModel, QModelIndex, QDate, QObject, pyqtSignal,
+                          QSortFilterProxyModel, QEvent)
+from PyQt6.QtGui import QFont, QFontMetricsF, QAction, QIcon
+from logic import TimerEngine, DEFAULT_TIMER
+from alerts import AlertDispatcher
+from persistence import StateJournal
+from tzcatalog import get_catalog
+from themes import ThemeEngine
+from timefmt import format_duration, format_total, DurationDisplay, ClockDisplay
+from metrics import REGISTRY
+
+TICK_JITTER = REGISTRY.histogram("timerapp_tick_jitter_seconds", "How late tick() ran relative to its scheduled time")
+TICK_DURATION = REGISTRY.histogram("timerapp_tick_duration_seconds", "Time spent in tick()")
+REPAINTS = REGISTRY.counter("timerapp_repaints_total", "Display label text changes")
+
+HIDDEN_MAX_DELAY_MS = 60_000 # Longest sleep between ticks while the window is off screen
+
+class EngineInvoker(QObject):
+    """Runs callables from other threads on the GUI thread, which owns the engine."""
+    invoke = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.invoke.connect(self._run, Qt.ConnectionType.QueuedConnection)
+
+    def call(self, func):
+        future = concurrent.futures.Future()
+        self.invoke.emit((func, future))
+        return future
+
+    def _run(self, job):
+        func, future = job
+        try:
+            future.set_result(func())
+        except Exception as e:
+            future.set_exception(e)
+
+class FontFitter:
+    """Chooses label point sizes and memoizes them.
+
+    The size is the label's old rule (scale_factor times the smaller side),
+    capped so the text's measured extent fits the label. Results are cached
+    per (size bucket, text length, scale factor, family), so a resize storm
+    mostly costs a dict lookup.
+    """
+    BUCKET = 8 # px
+    REFERENCE_SIZE = 100 # pt, measured once and scaled linearly
+    FILL = 0.92 # Share of the label the text may cover
+
+    def __init__(self):
+        self.cache = {}
+
+    def point_size(self, font, text, width, height, scale_factor):
+        bw, bh = width // self.BUCKET, height // self.BUCKET
+        key = (bw, bh, len(text), scale_factor, font.family())
+        size = self.cache.get(key)
+        if size is None:
+            size = self.cache[key] = self._fit(font, text, bw * self.BUCKET, bh * self.BUCKET, scale_factor)
+        return size
+
+    def _fit(self, font, text, width, height, scale_factor):
+        size = int(min(width, height) * scale_factor)
+        if text:
+            ref = QFont(font)
+            ref.setPointSize(self.REFERENCE_SIZE)
+            metrics = QFontMetricsF(ref)
+            text_width = metrics.horizontalAdvance(text)
+            if text_width > 0:
+                size = min(size, int(self.REFERENCE_SIZE * width * self.FILL / text_width))
+            size = min(size, int(self.REFERENCE_SIZE * height * self.FILL / metrics.height()))
+        return max(size, 10)
 
 class ResizableLabel(QLabel):
+    fitter = FontFitter() # Shared by all labels
+
     def __init__(self, text="", scale_factor=0.4):
         super().__init__(text)
         self.scale_factor = scale_factor
         self.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        self._text = text
+
+    def setText(self, text):
+        # Skip relabelling when the rendered string has not changed
+        if text != self._text:
+            refit = len(text) != len(self._text)
+            self._text = text
+            REPAINTS.inc()
+            super().setText(text)
+            if refit:
+                self.adjust_font()
 
     def resizeEvent(self, event):
         self.adjust_font()
         super().resizeEvent(event)
 
     def adjust_font(self):
-        # Calculate font size based on the smaller dimension to fit well
-        size = min(self.width(), self.height())
-        font_size = int(size * self.scale_factor)
-        if font_size < 10: font_size = 10
         font = self.font()
+        font_size = self.fitter.point_size(font, self._text, self.width(), self.height(), self.scale_factor)
+        if font_size == font.pointSize():
+            return # Avoids a relayout when nothing changed
         font.setPointSize(font_size)
         self.setFont(font)
 
+class IncrementalListModel(QAbstractListModel):
+    """List model that hands rows to the view a block at a time through fetchMore.
+
+    QListView lays out every row it is told about, so exposing rows on demand
+    keeps opening, inserting and scrolling cheap however long the list is.
+    """
+    BLOCK_SIZE = 256
+
+    def __init__(self, total=0, parent=None):
+        super().__init__(parent)
+        self.total = total
+        self._window = self.BLOCK_SIZE # Rows the view has asked for
+        self._loaded = min(total, self._window) # Rows handed to the view so far
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(self.total - self._loaded, self.BLOCK_SIZE)
+        self._window = self._loaded + count
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def reset_rows(self, total):
+        self.beginResetModel()
+        self.total = total
+        self._window = self.BLOCK_SIZE
+        self._loaded = min(total, self._window)
+        self.clear_cache()
+        self.endResetModel()
+
+    def prepend_row(self):
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.total += 1
+        self._loaded += 1
+        self.clear_cache()
+        self.endInsertRows()
+        # Keep the window the same size; the oldest row can be fetched again
+        if self._loaded > self._window:
+            self.beginRemoveRows(QModelIndex(), self._window, self._window)
+            self._loaded -= 1
+            self.endRemoveRows()
+
+    def clear_cache(self):
+        pass
+
+class HistoryModel(IncrementalListModel):
+    """Newest-first view over the history store.
+
+    Entries are fetched from the store in cached blocks and formatted only when
+    painted, so opening the dialog costs the same for 10 or 10M entries.
+    """
+    MAX_BLOCKS = 32
+
+    def __init__(self, store, parent=None):
+        super().__init__(store.count(), parent)
+        self.store = store
+        self.filters = {}
+        self._blocks = OrderedDict() # block index -> [entries, formatted texts]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        entries, texts = self._block(index.row() // self.BLOCK_SIZE)
+        i = index.row() % self.BLOCK_SIZE
+        if i >= len(entries):
+            return None
+        if texts[i] is None:
+            texts[i] = self.format_entry(entries[i])
+        return texts[i]
+
+    def entry(self, row):
+        entries, _ = self._block(row // self.BLOCK_SIZE)
+        return entries[row % self.BLOCK_SIZE]
+
+    def set_filters(self, **filters):
+        self.filters = filters
+        self.reset_rows(self.store.count(**filters))
+
+    def append(self, entry):
+        """Shows an entry logged while the view is open."""
+        if self.store.matches(entry, **self.filters):
+            self.prepend_row()
+
+    def clear_cache(self):
+        # Offsets shift on insert; blocks are refetched for the viewport only
+        self._blocks.clear()
+
+    def _block(self, n):
+        block = self._blocks.get(n)
+        if block is None:
+            entries = self.store.page(n * self.BLOCK_SIZE, self.BLOCK_SIZE, **self.filters)
+            block = self._blocks[n] = [entries, [None] * len(entries)]
+            if len(self._blocks) > self.MAX_BLOCKS:
+                self._blocks.popitem(last=False)
+        else:
+            self._blocks.move_to_end(n)
+        return block
+
+    @staticmethod
+    def format_entry(item):
+        ts = item['timestamp'].strftime("%H:%M:%S")
+        return f"#{item['id']} - {format_duration(item['duration'])} (at {ts})"
+
+class LapModel(IncrementalListModel):
+    """Newest-first view over the stopwatch's LapStore."""
+
+    def __init__(self, laps, formatter, parent=None):
+        super().__init__(len(laps), parent)
+        self.laps = laps
+        self.formatter = formatter
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        i = len(self.laps) - 1 - index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.formatter(self.laps[i], True)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"Lap {i + 1}: +{self.formatter(self.laps.splits[i], True)}"
+        return None
+
 class HistoryDialog(QDialog):
     def __init__(self, engine, parent=None):
         super().__init__(parent)
@@ -40,27 +249,197 @@ class HistoryDialog(QDialog):
         self.engine = engine
         self.setFixedSize(300, 400)
         layout = QVBoxLayout()
-        self.list_widget = QListWidget()
-        layout.addWidget(self.list_widget)
+
+        # Filters: date range and duration range (minutes)
+        self.filter_cb = QCheckBox("Filter")
+        self.filter_cb.toggled.connect(self.apply_filter)
+        layout.addWidget(self.filter_cb)
+
+        filter_layout = QGridLayout()
+        today = QDate.currentDate()
+        self.from_date = QDateEdit(today.addDays(-7))
+        self.to_date = QDateEdit(today)
+        self.min_dur = QSpinBox()
+        self.max_dur = QSpinBox()
+        for date_edit in (self.from_date, self.to_date):
+            date_edit.setCalendarPopup(True)
+            date_edit.dateChanged.connect(self.apply_filter)
+        for spin in (self.min_dur, self.max_dur):
+            spin.setRange(0, 9999)
+            spin.setSuffix(" m")
+            spin.valueChanged.connect(self.apply_filter)
+        self.max_dur.setSpecialValueText("Any")
+        filter_layout.addWidget(QLabel("From"), 0, 0)
+        filter_layout.addWidget(self.from_date, 0, 1)
+        filter_layout.addWidget(QLabel("To"), 0, 2)
+        filter_layout.addWidget(self.to_date, 0, 3)
+        filter_layout.addWidget(QLabel("Min"), 1, 0)
+        filter_layout.addWidget(self.min_dur, 1, 1)
+        filter_layout.addWidget(QLabel("Max"), 1, 2)
+        filter_layout.addWidget(self.max_dur, 1, 3)
+        self.filter_box = QWidget()
+        self.filter_box.setLayout(filter_layout)
+        self.filter_box.setEnabled(False)
+        layout.addWidget(self.filter_box)
+
+        self.model = HistoryModel(engine.history, self)
+        self.list_view = QListView()
+        self.list_view.setUniformItemSizes(True) # Lets the view skip per-row layout
+        self.list_view.setModel(self.model)
+
+        self.empty_label = QLabel("No completed timers yet")
+        self.empty_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        entries_page = QWidget()
+        entries_layout = QVBoxLayout(entries_page)
+        entries_layout.setContentsMargins(0, 0, 0, 0)
+        entries_layout.addWidget(self.list_view)
+        entries_layout.addWidget(self.empty_label)
+
+        # Statistics for the same filters, computed only while the tab is shown
+        self.stats_label = QLabel()
+        self.stats_label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+        self.stats_label.setFont(QFont("Consolas", 9))
+        self.stats_label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+
+        self.tabs = QTabWidget()
+        self.tabs.addTab(entries_page, "Entries")
+        self.tabs.addTab(self.stats_label, "Statistics")
+        self.tabs.currentChanged.connect(self.update_stats)
+        layout.addWidget(self.tabs)
         self.setLayout(layout)
+
+        self.engine.add_listener(self.on_engine_event)
+        self.finished.connect(lambda _: self.engine.remove_listener(self.on_engine_event))
         self.populate()
 
     def populate(self):
-        self.list_widget.clear()
-        if not self.engine.history:
-            self.list_widget.addItem("No completed timers yet")
-        else:
-            for item in reversed(self.engine.history):
-                # Format duration
-                mins, secs = divmod(item['duration'], 60)
-                hours, mins = divmod(mins, 60)
-                if hours > 0:
-                    dur_str = f"{hours}:{mins:02}:{secs:02}"
-                else:
-                    dur_str = f"{mins:02}:{secs:02}"
-
-                ts = item['timestamp'].strftime("%H:%M:%S")
-                self.list_widget.addItem(f"#{item['id']} - {dur_str} (at {ts})")
+        self.model.set_filters(**self.current_filters())
+        self.update_empty_state()
+        self.update_stats()
+
+    def current_filters(self):
+        if not self.filter_cb.isChecked():
+            return {}
+        start = datetime.datetime.combine(self.from_date.date().toPyDate(), datetime.time())
+        end = datetime.datetime.combine(self.to_date.date().toPyDate(), datetime.time()) + datetime.timedelta(days=1)
+        return {
+            'start': start,
+            'end': end,
+            'min_duration': self.min_dur.value() * 60 or None,
+            'max_duration': self.max_dur.value() * 60 or None,
+        }
+
+    def apply_filter(self, *args):
+        self.filter_box.setEnabled(self.filter_cb.isChecked())
+        self.populate()
+
+    def update_empty_state(self):
+        empty = self.model.rowCount() == 0
+        self.empty_label.setText("No matching timers" if self.model.filters else "No completed timers yet")
+        self.empty_label.setVisible(empty)
+        self.list_view.setVisible(not empty)
+        self.setWindowTitle(f"Session History ({self.model.total})")
+
+    def update_stats(self, *args):
+        if self.tabs.currentWidget() is not self.stats_label:
+            return
+        try:
+            analytics = self.engine.analytics
+        except ImportError as e:
+            self.stats_label.setText(f"Statistics need NumPy ({e})")
+            return
+        filters = self.current_filters()
+        summary = analytics.summary(**filters)
+        if not summary['count']:
+            self.stats_label.setText("No matching timers" if filters else "No completed timers yet")
+            return
+        fmt = format_total
+        lines = [f"Timers   {summary['count']:,}",
+                 f"Total    {fmt(summary['total'])}",
+                 f"Mean     {fmt(summary['mean'])}",
+                 f"Median   {fmt(summary['p50'])}",
+                 f"p90      {fmt(summary['p90'])}",
+                 f"p99      {fmt(summary['p99'])}",
+                 f"Longest  {fmt(summary['longest'])}",
+                 "", "Days"]
+        lines += [f"{date:%a %d %b}  {count:5}  {fmt(seconds)}"
+                  for date, count, seconds in analytics.totals_by_day(**filters)[-7:]]
+        lines += ["", "Weeks"]
+        lines += [f"{monday:%d %b %Y}  {count:5}  {fmt(seconds)}"
+                  for monday, count, seconds in analytics.totals_by_week(**filters)[-4:]]
+        self.stats_label.setText("\n".join(lines))
+
+    def on_engine_event(self, event, data):
+        if event == 'history':
+            self.model.append(data)
+            self.update_empty_state()
+            self.update_stats()
+
+class TimezoneModel(QAbstractListModel):
+    """Every time zone with its UTC offset. One instance is shared by all settings dialogs."""
+    NameRole = Qt.ItemDataRole.UserRole
+    _shared = None
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls(get_catalog())
+        return cls._shared
+
+    def __init__(self, catalog, parent=None):
+        super().__init__(parent)
+        self.catalog = catalog
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.catalog.names)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        name = self.catalog.names[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            offset = self.catalog.offsets.get(name)
+            return f"{name}  ({offset})" if offset else name
+        if role == self.NameRole:
+            return name
+        return None
+
+    def reload(self, prepared=None):
+        """Installs lists from TimezoneCatalog.prepare (if given) inside a model reset. GUI thread only."""
+        self.beginResetModel()
+        if prepared is not None:
+            self.catalog.install(prepared)
+        self.endResetModel()
+
+class TimezoneFilterModel(QSortFilterProxyModel):
+    """Shows the catalog's search results for a query, best matches (prefix matches) first."""
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.query = ""
+        self.ranks = None # name -> position in the search results; None shows every zone
+        self.setSourceModel(source)
+        source.modelReset.connect(self.source_reset)
+
+    def source_reset(self):
+        self.set_query(self.query) # Search the new names
+
+    def set_query(self, query):
+        self.query = query
+        results = self.sourceModel().catalog.search(query) if query.strip() else None
+        self.ranks = {name: i for i, name in enumerate(results)} if results is not None else None
+        self.invalidate() # Refilters and re-sorts by the new ranks
+        self.sort(0 if self.ranks is not None else -1) # -1: source (alphabetical) order
+
+    def filterAcceptsRow(self, row, parent):
+        return self.ranks is None or self.sourceModel().catalog.names[row] in self.ranks
+
+    def lessThan(self, left, right):
+        if self.ranks is None:
+            return left.row() < right.row()
+        names, last = self.sourceModel().catalog.names, len(self.ranks)
+        return self.ranks.get(names[left.row()], last) < self.ranks.get(names[right.row()], last)
 
 class SettingsDialog(QDialog):
     def __init__(self, engine, main_window, parent=None):
@@ -68,7 +447,7 @@ class SettingsDialog(QDialog):
         self.setWindowTitle("Settings")
         self.engine = engine
         self.main_window = main_window
-        self.setFixedSize(300, 250)
+        self.setFixedSize(300, 290)
         layout = QVBoxLayout()
 
         # Dark/Light Mode
@@ -89,13 +468,24 @@ class SettingsDialog(QDialog):
         self.use_system_cb.toggled.connect(self.toggle_system_time)
         layout.addWidget(self.use_system_cb)
 
+        self.tz_search = QLineEdit()
+        self.tz_search.setPlaceholderText("Search time zones")
+        self.tz_search.setClearButtonEnabled(True)
+        self.tz_search.textChanged.connect(self.filter_timezones)
+        self.tz_search.returnPressed.connect(self.pick_first_timezone)
+        layout.addWidget(self.tz_search)
+
+        # The zone list is a shared model, so opening the dialog builds nothing
+        self.tz_model = TimezoneFilterModel(TimezoneModel.shared(), self)
         self.tz_combo = QComboBox()
-        self.tz_combo.addItems(self.engine.available_timezones)
-        if self.engine.timezone in self.engine.available_timezones:
-            self.tz_combo.setCurrentText(self.engine.timezone)
-        self.tz_combo.setEnabled(not self.engine.use_system_time)
-        self.tz_combo.currentTextChanged.connect(self.set_timezone)
+        self.tz_combo.setModel(self.tz_model)
+        # Sizing to contents would measure every zone name
+        self.tz_combo.setSizeAdjustPolicy(QComboBox.SizeAdjustPolicy.AdjustToMinimumContentsLengthWithIcon)
+        self.tz_combo.setMinimumContentsLength(20)
+        self.select_timezone(self.engine.timezone)
+        self.tz_combo.activated.connect(self.timezone_activated)
         layout.addWidget(self.tz_combo)
+        self.set_tz_enabled(not self.engine.use_system_time)
 
         self.setLayout(layout)
 
@@ -104,19 +494,51 @@ class SettingsDialog(QDialog):
 
     def set_format(self, checked):
         self.engine.time_format_24h = checked
+        self.main_window.request_tick()
 
     def toggle_system_time(self, checked):
         self.engine.use_system_time = checked
-        self.tz_combo.setEnabled(not checked)
+        self.set_tz_enabled(not checked)
+        self.main_window.request_tick()
+
+    def set_tz_enabled(self, enabled):
+        self.tz_search.setEnabled(enabled)
+        self.tz_combo.setEnabled(enabled)
+
+    def select_timezone(self, name):
+        row = self.tz_model.sourceModel().catalog.index(name) if name else -1
+        if row >= 0:
+            index = self.tz_model.mapFromSource(self.tz_model.sourceModel().index(row))
+            self.tz_combo.setCurrentIndex(index.row())
+
+    def filter_timezones(self, text):
+        self.tz_model.set_query(text)
+
+    def pick_first_timezone(self):
+        if self.tz_model.rowCount() > 0:
+            self.tz_combo.setCurrentIndex(0)
+            self.timezone_activated(0)
+
+    def timezone_activated(self, row):
+        self.set_timezone(self.tz_combo.itemData(row, TimezoneModel.NameRole))
 
     def set_timezone(self, text):
         self.engine.timezone = text
+        self.main_window.request_tick()
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    first_painted = pyqtSignal()
+
+    def __init__(self, engine=None):
         super().__init__()
-        self.engine = TimerEngine()
+        self.painted = False
+        self.engine = engine or TimerEngine()
+        self.engine.add_listener(self.on_engine_event)
+        self.alerts = AlertDispatcher()
+        self.invoker = EngineInvoker(self)
+        self.control_server = None
         self.is_dark = True
+        self.themes = ThemeEngine()
         
         self.setWindowTitle("Timer & Clock")
         self.resize(400, 500)
@@ -196,6 +618,7 @@ class MainWindow(QMainWindow):
         running_layout = QVBoxLayout(self.timer_running_view)
         
         self.timer_display = ResizableLabel("00:00", scale_factor=0.3)
+        self.timer_text = DurationDisplay()
         running_layout.addWidget(self.timer_display)
         
         controls_layout = QHBoxLayout()
@@ -210,6 +633,12 @@ class MainWindow(QMainWindow):
         running_layout.addLayout(controls_layout)
         
         self.timer_layout.addWidget(self.timer_running_view)
+
+        # Countdowns other than the main one (from the command line or the control server)
+        self.named_timers = QLabel()
+        self.named_timers.setVisible(False)
+        self.named_timers_dirty = False # Rebuilt at most once per tick
+        self.timer_layout.addWidget(self.named_timers)
         
         self.stack.addWidget(self.timer_page)
 
@@ -220,14 +649,23 @@ class MainWindow(QMainWindow):
         # Main content area with horizontal layout (laps on left, timer on right)
         content_layout = QHBoxLayout()
 
-        # Left side: Laps list (auto-width based on content)
-        self.laps_list = QListWidget()
+        # Left side: Laps list (auto-width based on content) and split statistics
+        laps_layout = QVBoxLayout()
+        self.laps_model = LapModel(self.engine.stopwatch_laps, self.format_time, self)
+        self.laps_list = QListView()
+        self.laps_list.setUniformItemSizes(True)
+        self.laps_list.setModel(self.laps_model)
         self.laps_list.setMaximumWidth(150)  # Limit width to fit text
         self.laps_list.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Expanding)
-        content_layout.addWidget(self.laps_list)
+        laps_layout.addWidget(self.laps_list)
+        self.laps_stats = QLabel()
+        self.laps_stats.setMaximumWidth(150)
+        laps_layout.addWidget(self.laps_stats)
+        content_layout.addLayout(laps_layout)
 
         # Right side: Timer display
         self.stopwatch_display = ResizableLabel("00:00.00", scale_factor=0.5)
+        self.stopwatch_text = DurationDisplay(centiseconds=True)
         content_layout.addWidget(self.stopwatch_display, stretch=1)
 
         stopwatch_layout.addLayout(content_layout)
@@ -247,53 +685,103 @@ class MainWindow(QMainWindow):
 
         # 3. Bottom Area (20% stretch) - Clock
         self.clock_display = ResizableLabel("12:00", scale_factor=0.4)
+        self.clock_text = ClockDisplay()
         self.main_layout.addWidget(self.clock_display, stretch=20)
 
-        # Timers
+        # Timers: single-shot, re-armed by tick() for the next visible change
         self.update_timer = QTimer()
+        self.update_timer.setSingleShot(True)
+        self.update_timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.update_timer.timeout.connect(self.tick)
-        self.update_timer.start(50) # Update every 50ms for smooth UI
+        self.tick_due_ns = None # perf_counter_ns when the armed tick should run
+
+        # Power saving: while nothing is on screen, tick() only runs the engine
+        self.on_screen = False
+        self.watched_window = None
+        QApplication.instance().applicationStateChanged.connect(self.update_visibility)
+        self.request_tick()
 
         self.apply_theme()
+        self.sync_from_engine()
         
-        # Fetch timezones in background
-        threading.Thread(target=self.engine.fetch_timezones, daemon=True).start()
+        # Subsystems not needed for the first frame start once it is drawn
+        self.first_painted.connect(self.start_background_tasks, Qt.ConnectionType.QueuedConnection)
+
+    def refresh_timezones(self):
+        # Runs on a worker thread; the model (created and reset only on the GUI
+        # thread) swaps the new lists in, so views never see them change mid-read
+        self.engine.fetch_timezones(
+            install=lambda prepared: self.invoker.call(lambda: TimezoneModel.shared().reload(prepared)))
+
+    # --- Visibility ---
+    # Minimized, hidden, fully covered (unexposed) or on a locked/suspended
+    # session all count as off screen.
+    def update_visibility(self, *args):
+        handle = self.windowHandle()
+        on_screen = (self.isVisible() and not self.isMinimized()
+                     and (handle is None or handle.isExposed())
+                     and QApplication.applicationState() not in (Qt.ApplicationState.ApplicationHidden,
+                                                                 Qt.ApplicationState.ApplicationSuspended))
+        if on_screen != self.on_screen:
+            self.on_screen = on_screen
+            # Coming back: one tick repaints everything. Going away: re-arm for engine deadlines only
+            self.request_tick()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        handle = self.windowHandle()
+        if handle is not None and handle is not self.watched_window:
+            handle.installEventFilter(self)
+            self.watched_window = handle
+        self.update_visibility()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_visibility()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.WindowStateChange:
+            self.update_visibility()
+
+    def eventFilter(self, obj, event):
+        if obj is self.watched_window and event.type() == QEvent.Type.Expose:
+            self.update_visibility()
+        return super().eventFilter(obj, event)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            self.first_painted.emit()
+
+    def start_background_tasks(self):
+        # Build the timezone catalog and revalidate its cached remote list in background
+        threading.Thread(target=self.refresh_timezones, daemon=True).start()
+
+        # Metrics export (Prometheus text format), opt-in
+        metrics_file = os.environ.get("TIMERAPP_METRICS_FILE")
+        if metrics_file:
+            REGISTRY.start_textfile_writer(metrics_file)
+        metrics_port = os.environ.get("TIMERAPP_METRICS_PORT")
+        if metrics_port:
+            try:
+                REGISTRY.serve(int(metrics_port))
+            except (OSError, ValueError) as e:
+                print(f"Metrics server failed: {e}")
+
+        # Local control server for automation scripts, opt-in
+        control_port = os.environ.get("TIMERAPP_CONTROL_PORT")
+        if control_port or os.environ.get("TIMERAPP_CONTROL"):
+            from control import ControlServer
+            try:
+                self.control_server = ControlServer(self.engine, port=int(control_port) if control_port else None,
+                                                    call=self.invoker.call).start()
+            except (OSError, ValueError) as e:
+                print(f"Control server failed: {e}")
 
     def apply_theme(self):
-        if self.is_dark:
-            self.setStyleSheet("""
-                QMainWindow { background-color: #2b2b2b; color: #ffffff; }
-                QWidget { color: #ffffff; }
-                QPushButton { 
-                    background-color: #3b3b3b; 
-                    border: 1px solid #555; 
-                    border-radius: 5px; 
-                    padding: 5px; 
-                    color: white;
-                }
-                QPushButton:hover { background-color: #4b4b4b; }
-                QPushButton:checked { background-color: #0078d7; }
-                QListWidget { background-color: #333; border: 1px solid #555; }
-                QComboBox, QSpinBox { background-color: #333; border: 1px solid #555; color: white; }
-                QLabel { color: white; }
-            """)
-        else:
-            self.setStyleSheet("""
-                QMainWindow { background-color: #f0f0f0; color: #000000; }
-                QWidget { color: #000000; }
-                QPushButton { 
-                    background-color: #e0e0e0; 
-                    border: 1px solid #ccc; 
-                    border-radius: 5px; 
-                    padding: 5px; 
-                    color: black;
-                }
-                QPushButton:hover { background-color: #d0d0d0; }
-                QPushButton:checked { background-color: #0078d7; color: white; }
-                QListWidget { background-color: white; border: 1px solid #ccc; }
-                QComboBox, QSpinBox { background-color: white; border: 1px solid #ccc; color: black; }
-                QLabel { color: black; }
-            """)
+        self.themes.apply(self, "dark" if self.is_dark else "light")
 
     def toggle_theme(self):
         self.is_dark = not self.is_dark
@@ -314,6 +802,7 @@ class MainWindow(QMainWindow):
         else:
             self.stack.setCurrentWidget(self.timer_page)
             self.mode_btn.setText("Timer")
+        self.request_tick()
 
     # --- Timer Logic ---
     def set_preset(self, seconds):
@@ -328,20 +817,12 @@ class MainWindow(QMainWindow):
 
         self.engine.set_timer(total)
         self.engine.start_timer()
-        
-        self.timer_setup.setVisible(False)
-        self.timer_running_view.setVisible(True)
-        self.timer_stop_btn.setText("Pause")
-        self.timer_stop_btn.setEnabled(True)
-        self.timer_display.setText(self.format_time(total))
 
     def toggle_timer_pause(self):
         if self.engine.timer_running:
             self.engine.pause_timer()
-            self.timer_stop_btn.setText("Resume")
         else:
             self.engine.start_timer()
-            self.timer_stop_btn.setText("Pause")
 
     # I need a way to go back to setup.
     # I'll add a 'Reset' button to timer_running_view
@@ -350,101 +831,283 @@ class MainWindow(QMainWindow):
     def sw_start_stop(self):
         if self.engine.stopwatch_running:
             self.engine.stop_stopwatch()
-            self.sw_start_stop_btn.setText("Start")
-            self.sw_lap_reset_btn.setText("Reset")
-            self.sw_start_stop_btn.setStyleSheet("background-color: #4CAF50; color: white;") # Greenish
         else:
             self.engine.start_stopwatch()
-            self.sw_start_stop_btn.setText("Stop")
-            self.sw_lap_reset_btn.setText("Lap")
-            self.sw_start_stop_btn.setStyleSheet("background-color: #f44336; color: white;") # Reddish
 
     def sw_lap_reset(self):
         if self.engine.stopwatch_running:
-            # Lap
-            t = self.engine.lap_stopwatch()
-            self.laps_list.insertItem(0, self.format_time(t, True))
+            self.engine.lap_stopwatch()
         else:
-            # Reset
             self.engine.reset_stopwatch()
-            self.laps_list.clear()
+
+    # --- Engine events ---
+    # The widgets follow engine events rather than button clicks, so changes
+    # made through the control server show up the same way.
+    def on_engine_event(self, event, data):
+        if event == 'timer_finished':
+            if data['name'] == DEFAULT_TIMER:
+                self.timer_finished_view()
+                message = 'Your timer has ended!'
+            else:
+                self.named_timers_dirty = True
+                message = f"{data['name']} has ended!"
+            # Sound and notification are delivered off the GUI thread; timers
+            # finishing together are merged into one alert
+            self.alerts.dispatch('Timer Finished', message)
+        elif event.startswith('timer_') and data['name'] != DEFAULT_TIMER:
+            self.named_timers_dirty = True
+        elif event.startswith('timer_'):
+            if event in ('timer_set', 'timer_started'):
+                self.timer_setup.setVisible(False)
+                self.timer_running_view.setVisible(True)
+                self.timer_stop_btn.setText("Pause" if event == 'timer_started' else "Start")
+                self.timer_stop_btn.setEnabled(True)
+                self.timer_display.setText(self.timer_text.render(self.engine.timer_remaining))
+            elif event == 'timer_paused':
+                self.timer_stop_btn.setText("Resume")
+            elif event == 'timer_reset':
+                self.timer_running_view.setVisible(False)
+                self.timer_setup.setVisible(True)
+                self.timer_stop_btn.setText("Pause") # Default state
+                self.timer_stop_btn.setEnabled(True)
+        elif event == 'stopwatch_started':
+            self.sw_start_stop_btn.setText("Stop")
+            self.sw_lap_reset_btn.setText("Lap")
+            self.themes.set_state(self.sw_start_stop_btn, "running") # Reddish
+        elif event == 'stopwatch_stopped':
+            self.sw_start_stop_btn.setText("Start")
+            self.sw_lap_reset_btn.setText("Reset")
+            self.themes.set_state(self.sw_start_stop_btn, "stopped") # Greenish
+        elif event == 'stopwatch_reset':
+            self.laps_model.reset_rows(0)
+            self.update_lap_stats()
             self.stopwatch_display.setText("00:00.00")
             self.sw_start_stop_btn.setText("Start")
             self.sw_lap_reset_btn.setText("Lap")
+        elif event == 'lap':
+            self.laps_model.prepend_row()
+            self.update_lap_stats()
+        elif event == 'schedule_fired':
+            missed = f" ({data['missed']} missed while away)" if data['missed'] else ""
+            self.alerts.dispatch('Timer Finished', f"{data['name']} is due{missed}")
+        elif event == 'restored':
+            self.sync_from_engine()
+        self.request_tick()
+
+    def sync_from_engine(self):
+        """Shows the engine's current state, e.g. after it was restored from disk."""
+        cd = self.engine.timers.get(DEFAULT_TIMER)
+        if cd.running:
+            self.on_engine_event('timer_started', {'name': DEFAULT_TIMER})
+        elif 0 < cd.remaining_ns < cd.duration_ns:
+            self.on_engine_event('timer_started', {'name': DEFAULT_TIMER})
+            self.on_engine_event('timer_paused', {'name': DEFAULT_TIMER})
+        elif cd.duration_ns and cd.remaining_ns == 0:
+            self.on_engine_event('timer_set', {'name': DEFAULT_TIMER})
+            self.timer_finished_view()
+        else:
+            self.on_engine_event('timer_reset', {'name': DEFAULT_TIMER})
+
+        if self.engine.stopwatch_running:
+            self.on_engine_event('stopwatch_started', None)
+        elif self.engine.stopwatch_elapsed_ns:
+            self.on_engine_event('stopwatch_stopped', None)
+        self.laps_model.reset_rows(len(self.engine.stopwatch_laps))
+        self.update_lap_stats()
+        self.update_named_timers()
+
+    def update_named_timers(self, limit=8):
+        """Lists the first `limit` countdowns other than the main one and counts the rest."""
+        self.named_timers_dirty = False
+        timers = self.engine.timers
+        count = len(timers) - (DEFAULT_TIMER in timers.timers)
+        now = self.engine.clock.now_ns()
+        lines = []
+        for cd in timers.timers.values():
+            if len(lines) == (limit if count <= limit else limit - 1):
+                break
+            if cd.name == DEFAULT_TIMER:
+                continue
+            remaining = cd.remaining_ns_at(now) / 1e9
+            state = "" if cd.running else " (finished)" if remaining == 0 else " (paused)"
+            lines.append(f"{cd.name}  {format_duration(remaining)}{state}")
+        if count > limit:
+            lines.append(f"... and {count - len(lines)} more")
+        self.named_timers.setText("\n".join(lines))
+        self.named_timers.setVisible(bool(lines))
+
+    def update_lap_stats(self):
+        laps = self.engine.stopwatch_laps
+        if not laps:
+            self.laps_stats.setText("")
+            return
+        self.laps_stats.setText(f"Best  {self.format_time(laps.best, True)}\n"
+                                f"Worst {self.format_time(laps.worst, True)}\n"
+                                f"Mean  {self.format_time(laps.mean, True)}\n"
+                                f"SD    {self.format_time(laps.stdev, True)}")
+
+    def handle_arguments(self, arguments):
+        """Starts the countdowns on a command line ('25m', 'tea=3m', ...) and brings the window up."""
+        if self.isMinimized():
+            self.showNormal()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        if not arguments:
+            return
+        from headless import parse_timer
+        for argument in arguments:
+            try:
+                name, seconds = parse_timer(argument)
+            except Exception as e:
+                print(f"Ignoring argument {argument!r}: {e}")
+                continue
+            name = name or DEFAULT_TIMER
+            self.engine.set_timer(seconds, name)
+            self.engine.start_timer(name)
+
+    def request_tick(self):
+        """Repaints as soon as the event loop is idle, e.g. after a state change."""
+        self.arm_tick(0)
+
+    def arm_tick(self, delay_ms):
+        self.tick_due_ns = time.perf_counter_ns() + delay_ms * 1_000_000
+        self.update_timer.start(delay_ms)
+
+    def next_tick_delay(self, now):
+        """Returns the milliseconds until the next visible change on screen."""
+        # Clock: next second boundary
+        delay = 1.0 - now.microsecond / 1e6
+
+        # Timer: next whole second of the countdown, or its exact deadline (or a schedule's)
+        deadline = self.engine.next_deadline()
+        if deadline is not None:
+            rem = self.engine.timer_remaining
+            if self.engine.timer_running and rem > 0:
+                delay = min(delay, rem - int(rem) or 1.0)
+            delay = min(delay, (deadline - self.engine.clock.now_ns()) / 1e9)
+
+        # Stopwatch: next centisecond, only while running and shown
+        if self.engine.stopwatch_running and self.stack.currentWidget() == self.stopwatch_page:
+            t = self.engine.get_stopwatch_time()
+            delay = min(delay, 0.01 - t % 0.01)
+
+        return max(1, math.ceil(delay * 1000))
+
+    def next_deadline_delay(self):
+        """Returns the milliseconds until the engine's next deadline, or None if nothing is running."""
+        deadline = self.engine.next_deadline()
+        if deadline is None:
+            return None
+        # Capped, as a monotonic timer may not count time the machine spent asleep
+        return max(1, min(math.ceil((deadline - self.engine.clock.now_ns()) / 1e6), HIDDEN_MAX_DELAY_MS))
 
     def tick(self):
-        # Update Clock
+        started = time.perf_counter_ns()
+        if self.tick_due_ns is not None:
+            TICK_JITTER.observe((started - self.tick_due_ns) / 1e9)
+
+        # Timers finish and schedules fire (and alert) even while nothing is shown
+        rem, finished = self.engine.update_timer() # Finished timers alert through on_engine_event
+
+        if not self.on_screen:
+            delay = self.next_deadline_delay()
+            if delay is None:
+                self.update_timer.stop()
+                self.tick_due_ns = None
+            else:
+                self.arm_tick(delay)
+            TICK_DURATION.observe((time.perf_counter_ns() - started) / 1e9)
+            return
+
+        # Update Clock (the display helpers return the same string while nothing changed)
         now = self.engine.get_current_time()
-        fmt = "%H:%M:%S" if self.engine.time_format_24h else "%I:%M:%S %p"
-        self.clock_display.setText(now.strftime(fmt))
+        self.clock_display.setText(self.clock_text.render(now, self.engine.time_format_24h))
 
         # Update Timer
-        if self.stack.currentWidget() == self.timer_page:
-            if self.engine.timer_running:
-                rem, finished = self.engine.update_timer()
-                if finished:
-                    self.timer_finished()
-                else:
-                    self.timer_display.setText(self.format_time(rem))
-            elif self.timer_running_view.isVisible():
-                 # Update display if paused
-                 rem, _ = self.engine.update_timer()
-                 self.timer_display.setText(self.format_time(rem))
+        if not finished and self.timer_running_view.isVisible():
+            self.timer_display.setText(self.timer_text.render(rem))
+        if self.named_timers_dirty or (len(self.engine.timers) > 1 and self.stack.currentWidget() == self.timer_page):
+            self.update_named_timers()
 
         # Update Stopwatch
         if self.stack.currentWidget() == self.stopwatch_page:
              t = self.engine.get_stopwatch_time()
-             self.stopwatch_display.setText(self.format_time(t, True))
+             self.stopwatch_display.setText(self.stopwatch_text.render(t))
 
-    def timer_finished(self):
+        self.arm_tick(self.next_tick_delay(now))
+        TICK_DURATION.observe((time.perf_counter_ns() - started) / 1e9)
+
+    # We don't auto-reset. User must press Reset.
+    def timer_finished_view(self):
         self.timer_display.setText("00:00")
         self.timer_stop_btn.setText("Finished")
         self.timer_stop_btn.setEnabled(False)
-        
-        # Play sound
-        if winsound:
-            try:
-                winsound.Beep(1000, 1000) # Frequency, Duration
-            except:
-                pass
-        
-        # Notification
-        try:
-            notification.notify(
-                title='Timer Finished',
-                message='Your timer has ended!',
-                app_name='Timer App',
-                timeout=10
-            )
-        except Exception as e:
-            print(f"Notification failed: {e}")
-            
-        # We don't auto-reset. User must press Reset.
+
+    def closeEvent(self, event):
+        if self.control_server:
+            self.control_server.stop()
+        self.alerts.close()
+        self.engine.close()
+        super().closeEvent(event)
 
     def return_to_timer_setup(self):
-        self.timer_running_view.setVisible(False)
-        self.timer_setup.setVisible(True)
         self.engine.reset_timer()
-        self.timer_stop_btn.setText("Pause") # Default state
 
     def format_time(self, seconds, show_centiseconds=False):
-        mins, secs = divmod(int(seconds), 60)
-        hours, mins = divmod(mins, 60)
-        
-        if show_centiseconds:
-            cs = int((seconds - int(seconds)) * 100)
-            if hours > 0:
-                return f"{hours:02}:{mins:02}:{secs:02}.{cs:02}"
-            return f"{mins:02}:{secs:02}.{cs:02}"
-        else:
-            if hours > 0:
-                return f"{hours:02}:{mins:02}:{secs:02}"
-            return f"{mins:02}:{secs:02}"
+        return format_duration(seconds, show_centiseconds)
+
+def write_startup_report(path, imported):
+    """Records startup timings for benchmarks/bench_startup.py."""
+    with open(path, "w") as f:
+        json.dump({
+            'import_s': imported - _START,
+            'first_paint_s': time.perf_counter() - _START,
+            'first_paint_wall': time.time(),
+        }, f)
 
 def main():
+    imported = time.perf_counter()
     app = QApplication(sys.argv)
-    window = MainWindow()
+    arguments = app.arguments()[1:] # Qt's own options removed
+    report = os.environ.get("TIMERAPP_STARTUP_REPORT")
+
+    # One instance per user; a second launch passes its arguments on and exits.
+    # Startup benchmarks launch many copies, so they skip this.
+    instance = None
+    if not report and not os.environ.get("TIMERAPP_MULTI_INSTANCE"):
+        from instance import SingleInstance
+        instance = SingleInstance()
+        if not instance.acquire():
+            if instance.forward(arguments):
+                sys.exit(0)
+            # The owner may have exited meanwhile; otherwise a second copy
+            # would share its history and state files, so give up
+            if not instance.acquire():
+                print("Instance forwarding failed; another TimerApp is running but not responding")
+                sys.exit(1)
+
+    engine = TimerEngine()
+    # Restores timers, stopwatch and laps from the last run, then journals changes
+    journal = StateJournal(engine).open()
+    app.aboutToQuit.connect(journal.close)
+    window = MainWindow(engine)
+    if instance:
+        instance.arguments_received.connect(window.handle_arguments)
+        app.aboutToQuit.connect(instance.release)
+        # Companion tools read the state from shared memory (see sharedstate.py)
+        from sharedstate import StatePublisher
+        try:
+            publisher = StatePublisher(engine).open()
+            app.aboutToQuit.connect(publisher.close)
+        except (OSError, ValueError) as e:
+            print(f"Shared state failed: {e}")
+    if report:
+        window.first_painted.connect(lambda: (write_startup_report(report, imported), app.quit()),
+                                     Qt.ConnectionType.QueuedConnection)
     window.show()
+    if arguments:
+        window.handle_arguments(arguments)
     sys.exit(app.exec())
 
 if __name__ == "__main__":
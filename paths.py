@@ -0,0 +1,11 @@
+import os
+
+APP_NAME = "TimerApp"
+
+def app_data_path(filename):
+    """Returns the path of a file in the per-user application data folder, creating the folder."""
+    base = os.environ.get("APPDATA") or os.environ.get("XDG_DATA_HOME") \
+        or os.path.join(os.path.expanduser("~"), ".local", "share")
+    folder = os.path.join(base, APP_NAME)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, filename)
@@ -0,0 +1,276 @@
+import os
+import json
+import base64
+import threading
+from array import array
+from paths import app_data_path
+
+SNAPSHOT_FILE = "state.json"
+WAL_FILE = "state.wal"
+LOCK_FILE = "state.lock"
+
+def lock_file(path):
+    """Takes an exclusive lock on `path` without waiting; returns the open file, or None if another process holds it."""
+    f = open(path, "a+")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+def unlock_file(f):
+    if os.name == "nt":
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    f.close() # Releases a flock too
+
+class StateJournal:
+    """Crash-safe persistence of TimerEngine state: a snapshot plus a write-ahead log.
+
+    Every state transition (timer set/start/pause/reset/finish, stopwatch
+    start/stop/reset, lap, schedule set/fired/removed) is appended to the WAL as one JSON line holding
+    the new state of the thing that changed, and flushed to the OS at once.
+    Everything that waits on the disk runs on a background thread: fsync is
+    batched, after `fsync_every` records or `fsync_interval` seconds,
+    whichever comes first. After `compact_after` records the journal moves
+    on to a new WAL file (state.wal.<generation>) and the background thread
+    writes the full state as a snapshot of that generation, then deletes the
+    older WAL files. Recovery reads the snapshot and the WAL files from its
+    generation on, so it stays bounded however long the session ran.
+
+    The journal locks the folder for its lifetime. If another process holds
+    the lock, open() neither restores nor logs anything.
+    """
+
+    def __init__(self, engine, directory=None, fsync_every=32, fsync_interval=1.0, compact_after=1000):
+        self.engine = engine
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE) if directory else app_data_path(SNAPSHOT_FILE)
+        self.directory = os.path.dirname(self.snapshot_path)
+        self.lock_path = os.path.join(self.directory, LOCK_FILE)
+        self.lock_file = None
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_after = compact_after
+        self.lock = threading.Lock()
+        self.wal = None
+        self.generation = 0 # Of the WAL file being written
+        self.records = 0 # Records in that file
+        self.unsynced = 0
+        self.pending_snapshot = None # (state, generation) for the worker to write
+        self.wake = threading.Event()
+        self.stop_syncing = threading.Event()
+        self.worker = None
+
+    # --- Lifecycle ---
+    def open(self):
+        """Restores the engine from disk, then starts logging its transitions."""
+        self.lock_file = lock_file(self.lock_path)
+        if self.lock_file is None:
+            print("State journal failed: the state folder is in use by another instance")
+            return self
+        state = self.recover()
+        if state is not None:
+            self.engine.restore_state(state)
+        self.snapshot() # Start from a fresh snapshot and an empty WAL
+        self._sync()
+        self.engine.add_listener(self.on_engine_event)
+        self.worker = threading.Thread(target=self._sync_loop, name="StateJournal", daemon=True)
+        self.worker.start()
+        return self
+
+    def close(self):
+        """Writes a final snapshot and stops logging."""
+        if self.lock_file is None:
+            return
+        self.engine.remove_listener(self.on_engine_event)
+        self.stop_syncing.set()
+        self.wake.set()
+        self.worker.join()
+        self.snapshot()
+        self._sync()
+        with self.lock:
+            if self.wal:
+                self.wal.close()
+                self.wal = None
+        unlock_file(self.lock_file)
+        self.lock_file = None
+
+    def wal_path(self, generation):
+        return os.path.join(self.directory, f"{WAL_FILE}.{generation}")
+
+    def wal_generations(self):
+        prefix = WAL_FILE + "."
+        return sorted(int(name[len(prefix):]) for name in os.listdir(self.directory)
+                      if name.startswith(prefix) and name[len(prefix):].isdigit())
+
+    # --- Recovery ---
+    def recover(self):
+        """Returns the last persisted state (snapshot + WAL replay), or None."""
+        state = None
+        generation = 0
+        try:
+            with open(self.snapshot_path) as f:
+                data = json.load(f)
+            state = self._decode_snapshot(data)
+            generation = data.get('generation', 0)
+        except (OSError, ValueError, KeyError):
+            pass
+        generations = self.wal_generations()
+        for g in generations:
+            if g < generation:
+                continue # Already in the snapshot
+            try:
+                with open(self.wal_path(g)) as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            break # Torn final write
+                        if state is None:
+                            state = {'timers': {}, 'stopwatch': None, 'laps': array('d'), 'schedules': {}}
+                        self._apply(state, record)
+            except OSError:
+                pass
+        self.generation = max(generations + [generation])
+        if state is not None:
+            state['timers'] = list(state['timers'].values())
+            state['schedules'] = list(state['schedules'].values())
+        return state
+
+    @staticmethod
+    def _apply(state, record):
+        kind = record['t']
+        if kind == 'timer':
+            state['timers'][record['name']] = record
+        elif kind == 'timer_removed':
+            state['timers'].pop(record['name'], None)
+        elif kind == 'stopwatch':
+            state['stopwatch'] = record
+            if record['event'] == 'stopwatch_reset':
+                state['laps'] = array('d')
+        elif kind == 'lap':
+            state['laps'].append(record['time'])
+        elif kind == 'schedule':
+            state['schedules'][record['name']] = record
+        elif kind == 'schedule_removed':
+            state['schedules'].pop(record['name'], None)
+
+    # --- Logging ---
+    def on_engine_event(self, event, data):
+        if event.startswith('timer_'):
+            if event == 'timer_removed':
+                record = {'t': 'timer_removed', 'name': data['name']}
+            else:
+                record = dict(self.engine.timer_state(data['name']), t='timer')
+        elif event.startswith('stopwatch_'):
+            record = dict(self.engine.stopwatch_state(), t='stopwatch')
+        elif event == 'lap':
+            record = {'t': 'lap', 'time': data['time']}
+        elif event == 'schedule_removed':
+            record = {'t': 'schedule_removed', 'name': data['name']}
+        elif event.startswith('schedule_'):
+            record = dict(self.engine.schedule_state(data['name']), t='schedule')
+        else:
+            return
+        record['event'] = event
+        self.append(record)
+
+    def append(self, record):
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self.lock:
+            if self.wal is None:
+                return
+            self.wal.write(line)
+            self.wal.flush() # Survives a process crash from here on
+            self.records += 1
+            self.unsynced += 1
+            # The first unsynced record starts the interval; a full batch ends it
+            sync = self.unsynced == 1 or self.unsynced >= self.fsync_every
+            compact = self.records >= self.compact_after
+        if sync:
+            self.wake.set()
+        if compact:
+            self.snapshot()
+
+    def snapshot(self):
+        """Moves on to a new WAL file and queues the full state for the worker to write as a snapshot."""
+        state = self.engine.export_state()
+        with self.lock:
+            if self.wal:
+                self.wal.close()
+            self.generation += 1
+            self.wal = open(self.wal_path(self.generation), "w")
+            self.records = 0
+            self.unsynced = 0
+            self.pending_snapshot = (state, self.generation)
+        self.wake.set()
+
+    def _write_snapshot(self, state, generation):
+        state = dict(self._encode_snapshot(state), generation=generation)
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        for g in self.wal_generations():
+            if g < generation:
+                try:
+                    os.remove(self.wal_path(g))
+                except OSError as e:
+                    print(f"State journal cleanup failed: {e}")
+
+    def _sync(self):
+        # Writes a queued snapshot, then fsyncs the current WAL file through
+        # its own descriptor, so appends need not wait for the disk
+        with self.lock:
+            pending, self.pending_snapshot = self.pending_snapshot, None
+            fd = None
+            if self.wal and self.unsynced:
+                fd = os.dup(self.wal.fileno())
+                self.unsynced = 0
+        if pending:
+            self._write_snapshot(*pending)
+        if fd is not None:
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _sync_loop(self):
+        # Sleeps while nothing is unsynced. After the first unsynced record it
+        # waits out the interval, cut short by a full batch or a snapshot
+        while not self.stop_syncing.is_set():
+            self.wake.wait()
+            self.wake.clear()
+            with self.lock:
+                ready = self.unsynced >= self.fsync_every or self.pending_snapshot is not None
+            if not ready and not self.stop_syncing.is_set():
+                self.wake.wait(self.fsync_interval)
+                self.wake.clear()
+            try:
+                self._sync()
+            except OSError as e:
+                print(f"State journal sync failed: {e}")
+
+    # Laps are stored as base64 doubles; JSON numbers would be several times larger
+    @staticmethod
+    def _encode_snapshot(state):
+        state = dict(state, version=1)
+        state['laps'] = base64.b64encode(array('d', state['laps']).tobytes()).decode()
+        return state
+
+    @staticmethod
+    def _decode_snapshot(data):
+        laps = array('d')
+        laps.frombytes(base64.b64decode(data['laps']))
+        return {'timers': {t['name']: t for t in data['timers']}, 'stopwatch': data['stopwatch'], 'laps': laps,
+                'schedules': {s['name']: s for s in data.get('schedules', ())}}
@@ -0,0 +1,301 @@
+"""Recurring timers: fixed intervals and wall-clock schedules such as 09:00 on weekdays.
+
+Schedules run on wall time (WallClock, nanoseconds since the epoch), not the
+engine's monotonic clock, so they stay on the calendar across clock changes
+and sleep. Each zone's UTC offset changes are precomputed once into a
+TransitionTable; after that, finding the next occurrence is a couple of
+bisects instead of tzinfo calls.
+"""
+import time
+import heapq
+import datetime
+from bisect import bisect_right
+from functools import lru_cache
+from clock import NS_PER_SECOND, WallClock, to_ns
+
+SECONDS_PER_DAY = 86400
+DAY_NAMES = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+WEEKDAYS = (0, 1, 2, 3, 4)
+EVERY_DAY = (0, 1, 2, 3, 4, 5, 6)
+MAX_MISSED = 100_000 # Bound on counting skipped occurrences after a very long sleep
+
+class TransitionTable:
+    """UTC offset changes of one zone, found once by sampling daily and bisecting to the second.
+
+    `offset_fn(t)` gives the UTC offset in seconds at epoch second t. The
+    table covers a few years around now and grows when asked about later
+    ones, or about earlier ones through cover().
+    """
+    SAMPLE_STEP = SECONDS_PER_DAY
+
+    def __init__(self, offset_fn, years=2):
+        self.offset_fn = offset_fn
+        now = int(time.time())
+        self.start = now - 366 * SECONDS_PER_DAY
+        self.end = self.start
+        self.starts = [self.start] # Epoch second each offset takes effect
+        self.offsets = [offset_fn(self.start)]
+        self._extend(now + years * 366 * SECONDS_PER_DAY)
+
+    def _extend(self, until):
+        t = self.end
+        offset = self.offsets[-1]
+        while t < until:
+            nxt = t + self.SAMPLE_STEP
+            new = self.offset_fn(nxt)
+            if new != offset:
+                self.starts.append(self._transition(t, nxt, offset))
+                self.offsets.append(new)
+                offset = new
+            t = nxt
+        self.end = t
+
+    def _extend_back(self, since):
+        # Scans forward from `since` to the current start; that start was only
+        # the table's edge, not a transition, so it is replaced
+        starts, offsets = [since], [self.offset_fn(since)]
+        t = since
+        while t < self.start:
+            nxt = min(t + self.SAMPLE_STEP, self.start)
+            new = self.offset_fn(nxt)
+            if new != offsets[-1]:
+                starts.append(self._transition(t, nxt, offsets[-1]))
+                offsets.append(new)
+            t = nxt
+        self.starts = starts + self.starts[1:]
+        self.offsets = offsets + self.offsets[1:]
+        self.start = since
+
+    def _transition(self, lo, hi, offset):
+        # Bisects to the first second after lo whose offset is not `offset`
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if self.offset_fn(mid) == offset:
+                lo = mid
+            else:
+                hi = mid
+        return hi
+
+    def cover(self, first, last):
+        """Extends the table to cover epoch seconds first..last."""
+        if last >= self.end:
+            self._extend(last + 366 * SECONDS_PER_DAY)
+        if first < self.start:
+            self._extend_back(first - SECONDS_PER_DAY)
+
+    def offset_at(self, t):
+        """UTC offset in seconds at epoch second t."""
+        if t >= self.end:
+            self._extend(t + 366 * SECONDS_PER_DAY)
+        elif t < self.start:
+            return self.offset_fn(t)
+        return self.offsets[bisect_right(self.starts, t) - 1]
+
+    def to_utc(self, local):
+        """Converts local wall seconds (local fields read as if UTC) to epoch seconds.
+
+        A repeated local time (clocks going back) maps to its first occurrence; a
+        skipped one (clocks going forward) maps to the same distance past the
+        transition, as zoneinfo does.
+        """
+        if local - 2 * SECONDS_PER_DAY < self.start:
+            # The candidates below come from the table, so it must reach back this far
+            self.cover(local - 2 * SECONDS_PER_DAY, local)
+        guess = local - self.offset_at(local)
+        i = bisect_right(self.starts, guess) - 1
+        valid = [local - o for o in {self.offsets[j] for j in range(max(i - 1, 0), min(i + 2, len(self.offsets)))}
+                 if self.offset_at(local - o) == o]
+        if valid:
+            return min(valid)
+        # In a gap: use the offset in effect before the transition
+        return local - self.offset_at(guess - SECONDS_PER_DAY)
+
+def _offset_fn(zone):
+    if zone is None:
+        # System zone; localtime follows its DST rules
+        return lambda t: time.localtime(t).tm_gmtoff
+    try:
+        import zoneinfo
+        tz = zoneinfo.ZoneInfo(zone)
+    except ImportError:
+        import pytz
+        tz = pytz.timezone(zone)
+    return lambda t: int(datetime.datetime.fromtimestamp(t, tz).utcoffset().total_seconds())
+
+@lru_cache(maxsize=None)
+def transitions(zone):
+    """Shared TransitionTable for a zone name (None for system time)."""
+    return TransitionTable(_offset_fn(zone))
+
+class IntervalSchedule:
+    """Fires every `seconds`, on a grid anchored at `anchor_ns` (wall clock)."""
+
+    def __init__(self, seconds, anchor_ns=None):
+        if seconds <= 0:
+            raise ValueError("interval must be positive")
+        self.seconds = seconds
+        self.interval_ns = to_ns(seconds)
+        self.anchor_ns = time.time_ns() if anchor_ns is None else anchor_ns
+
+    @property
+    def spec(self):
+        return {'every': self.seconds, 'anchor_ns': self.anchor_ns}
+
+    def next_after(self, t_ns):
+        """First occurrence strictly after t_ns."""
+        if t_ns < self.anchor_ns:
+            return self.anchor_ns + self.interval_ns
+        return self.anchor_ns + ((t_ns - self.anchor_ns) // self.interval_ns + 1) * self.interval_ns
+
+    def advance(self, fired_ns, now_ns):
+        """Returns (next occurrence after now_ns, occurrences skipped between fired_ns and now_ns)."""
+        nxt = self.next_after(now_ns)
+        return nxt, max((nxt - fired_ns) // self.interval_ns - 1, 0)
+
+class CalendarSchedule:
+    """Fires at a local time of day (hour, minute) on the given weekdays (0 = Monday) in `zone`."""
+
+    def __init__(self, hour, minute=0, days=EVERY_DAY, zone=None):
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            raise ValueError(f"invalid time of day: {hour:02}:{minute:02}")
+        days = tuple(sorted(set(days)))
+        if not days or not all(0 <= d < 7 for d in days):
+            raise ValueError("days must be weekday numbers 0-6 (Monday is 0)")
+        self.hour = hour
+        self.minute = minute
+        self.days = days
+        self.zone = zone
+        self.table = transitions(zone)
+
+    @property
+    def spec(self):
+        return {'at': f"{self.hour:02}:{self.minute:02}", 'days': list(self.days), 'zone': self.zone}
+
+    def next_after(self, t_ns):
+        t = t_ns // NS_PER_SECOND
+        table = self.table
+        day = (t + table.offset_at(t)) // SECONDS_PER_DAY
+        time_of_day = self.hour * 3600 + self.minute * 60
+        for d in range(day, day + 8):
+            if (d + 3) % 7 in self.days: # 1970-01-01 was a Thursday
+                utc = table.to_utc(d * SECONDS_PER_DAY + time_of_day)
+                if utc * NS_PER_SECOND > t_ns:
+                    return utc * NS_PER_SECOND
+        # Only reachable if a transition swallowed the time on every listed day
+        return self.next_after((day + 8) * SECONDS_PER_DAY * NS_PER_SECOND)
+
+    def advance(self, fired_ns, now_ns):
+        nxt = self.next_after(fired_ns)
+        missed = 0
+        while nxt <= now_ns and missed < MAX_MISSED:
+            missed += 1
+            nxt = self.next_after(nxt)
+        if nxt <= now_ns:
+            nxt = self.next_after(now_ns)
+        return nxt, missed
+
+def parse_days(text):
+    """Parses 'weekdays', 'weekends', 'daily' or a list such as 'mon,wed,fri' / 'mon-fri'."""
+    text = text.strip().lower()
+    if text in ("", "daily", "everyday"):
+        return EVERY_DAY
+    if text == "weekdays":
+        return WEEKDAYS
+    if text == "weekends":
+        return (5, 6)
+    days = set()
+    for part in text.split(","):
+        first, _, last = part.strip().partition("-")
+        try:
+            a = DAY_NAMES.index(first[:3])
+            b = DAY_NAMES.index(last[:3]) if last else a
+        except ValueError:
+            raise ValueError(f"invalid day: {part.strip()!r}")
+        days.update(range(a, b + 1) if a <= b else [*range(a, 7), *range(0, b + 1)])
+    return tuple(sorted(days))
+
+def make_schedule(spec, now_ns=None):
+    """Builds a schedule from a spec dict: {'every': seconds} or {'at': 'HH:MM', 'days': ..., 'zone': ...}.
+
+    'days' may be a list of weekday numbers or a string for parse_days. An
+    interval without 'anchor_ns' starts counting at now_ns.
+    """
+    if 'every' in spec:
+        return IntervalSchedule(float(spec['every']), spec.get('anchor_ns', now_ns))
+    if 'at' in spec:
+        hour, _, minute = str(spec['at']).partition(":")
+        days = spec.get('days', EVERY_DAY)
+        if isinstance(days, str):
+            days = parse_days(days)
+        return CalendarSchedule(int(hour), int(minute or 0), days, spec.get('zone'))
+    raise ValueError("schedule needs 'every' or 'at'")
+
+class Scheduler:
+    """Named schedules ordered by next occurrence in a min-heap, with lazy deletion like MultiTimerEngine.
+
+    A fire that is overdue by several occurrences (the machine slept, or the
+    app was closed) is reported once with a count of the occurrences it
+    skipped, and the schedule moves on to its next one after now.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or WallClock()
+        self.schedules = {}
+        self.next_ns = {} # name -> next occurrence
+        self._heap = [] # (next_ns, seq, name)
+        self._seqs = {}
+        self._seq = 0
+
+    def __len__(self):
+        return len(self.schedules)
+
+    def __contains__(self, name):
+        return name in self.schedules
+
+    def get(self, name):
+        return self.schedules[name]
+
+    def add(self, name, schedule, next_ns=None):
+        """Adds or replaces a schedule; `next_ns` restores a saved next occurrence."""
+        self.schedules[name] = schedule
+        self._queue(name, schedule.next_after(self.clock.now_ns()) if next_ns is None else next_ns)
+        return schedule
+
+    def remove(self, name):
+        if self.schedules.pop(name, None) is not None:
+            del self.next_ns[name]
+            del self._seqs[name]
+
+    def next_deadline(self):
+        """Returns the earliest next occurrence (wall clock nanoseconds), or None."""
+        heap = self._heap
+        while heap:
+            next_ns, seq, name = heap[0]
+            if self._seqs.get(name) == seq:
+                return next_ns
+            heapq.heappop(heap)
+        return None
+
+    def pop_due(self, now_ns=None):
+        """Returns (name, scheduled_ns, missed) for every schedule due by now and queues its next occurrence."""
+        if now_ns is None:
+            now_ns = self.clock.now_ns()
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= now_ns:
+            fired_ns, seq, name = heapq.heappop(heap)
+            if self._seqs.get(name) != seq:
+                continue
+            nxt, missed = self.schedules[name].advance(fired_ns, now_ns)
+            self._queue(name, nxt)
+            due.append((name, fired_ns, missed))
+        return due
+
+    def _queue(self, name, next_ns):
+        self._seq += 1
+        self._seqs[name] = self._seq
+        self.next_ns[name] = next_ns
+        heapq.heappush(self._heap, (next_ns, self._seq, name))
+        if len(self._heap) > 2 * len(self.schedules) + 64:
+            self._heap = [e for e in self._heap if self._seqs.get(e[2]) == e[1]]
+            heapq.heapify(self._heap)
@@ -0,0 +1,258 @@
+"""Read-only engine state in shared memory, for status bars, overlays and other companion tools.
+
+The running app maps `state.mmap` in the app data folder and rewrites it on
+every engine event; readers map the same file and decode fields in place
+with struct.unpack_from, without a request to the app. Running times are
+stored as deadlines and start times on the system monotonic clock
+(time.monotonic_ns), so readers compute live values themselves and the app
+does not write on every tick.
+
+Writes are guarded by a sequence lock: the writer makes the sequence number
+odd before changing anything and even again after, and a reader retries if
+the number was odd or changed while it read.
+
+    python -m sharedstate            # print the state once
+    python -m sharedstate --watch    # keep printing it
+"""
+import os
+import sys
+import mmap
+import time
+import struct
+import argparse
+from array import array
+from paths import app_data_path
+
+STATE_FILE = "state.mmap"
+MAGIC = b"TMRS"
+VERSION = 1
+MAX_TIMERS = 256
+MAX_LAPS = 256 # Most recent laps kept in the region
+NAME_BYTES = 32
+
+# Layout (little-endian, fixed offsets)
+HEADER = struct.Struct("<4sIQqqI4x") # magic, version, sequence, published monotonic ns, published wall ns, writer pid
+SEQUENCE = struct.Struct("<Q")
+SEQUENCE_OFFSET = 8
+STOPWATCH = struct.Struct("<?7xqqQ") # running, elapsed ns before start, start monotonic ns, lap count
+LAP_STATS = struct.Struct("<dddd") # best, worst, mean, stdev of the splits (NaN if no laps)
+TIMER_COUNT = struct.Struct("<I4x")
+TIMER = struct.Struct(f"<{NAME_BYTES}s?7xdqq") # name, running, duration s, remaining ns, deadline monotonic ns
+
+STOPWATCH_OFFSET = HEADER.size
+LAP_STATS_OFFSET = STOPWATCH_OFFSET + STOPWATCH.size
+LAPS_OFFSET = LAP_STATS_OFFSET + LAP_STATS.size
+TIMER_COUNT_OFFSET = LAPS_OFFSET + MAX_LAPS * 8
+TIMERS_OFFSET = TIMER_COUNT_OFFSET + TIMER_COUNT.size
+SIZE = TIMERS_OFFSET + MAX_TIMERS * TIMER.size
+
+NAN = float("nan")
+
+class StatePublisher:
+    """Writes a TimerEngine's state to the shared region after every engine event.
+
+    Each timer keeps its slot, so a timer event rewrites one slot and a lap
+    rewrites the stopwatch fields and the newest lap; only a restore (or a
+    removal with more timers than slots) repacks everything.
+
+    The engine must use the default MonotonicClock for readers to compute
+    live times.
+    """
+
+    def __init__(self, engine, path=None):
+        self.engine = engine
+        self.path = path or app_data_path(STATE_FILE)
+        self.file = None
+        self.map = None
+        self.sequence = 0
+        self.slots = {} # timer name -> slot index
+        self.names = [] # slot index -> timer name
+
+    def open(self):
+        self.file = open(self.path, "a+b")
+        self.file.truncate(SIZE)
+        self.map = mmap.mmap(self.file.fileno(), SIZE)
+        self.sequence = SEQUENCE.unpack_from(self.map, SEQUENCE_OFFSET)[0] & ~1
+        self.publish()
+        self.engine.add_listener(self.on_engine_event)
+        return self
+
+    def close(self):
+        if self.map is None:
+            return
+        self.engine.remove_listener(self.on_engine_event)
+        self.publish(pid=0) # Readers see that nothing is updating this any more
+        self.map.close()
+        self.file.close()
+        self.map = None
+
+    def on_engine_event(self, event, data):
+        if event.startswith('timer_'):
+            name = data['name']
+            if event == 'timer_removed':
+                if len(self.engine.timers) >= MAX_TIMERS:
+                    self.publish() # A timer without a slot may take the freed one
+                else:
+                    self._write(self._remove_slot, name)
+            else:
+                self._write(self._pack_timer, name)
+        elif event.startswith('stopwatch_') or event == 'lap':
+            self._write(self._pack_stopwatch, event == 'lap')
+        elif event == 'restored':
+            self.publish()
+
+    def publish(self, pid=None):
+        """Repacks the whole region."""
+        self.slots.clear()
+        self.names.clear()
+        def pack_all():
+            self._pack_stopwatch(all_laps=True)
+            for name in self.engine.timers.timers:
+                if len(self.names) == MAX_TIMERS:
+                    break
+                self._pack_timer(name)
+        self._write(pack_all, pid=pid)
+
+    def _write(self, pack, *args, pid=None):
+        # Runs pack(*args) inside the sequence lock and stamps the header
+        mm = self.map
+        self.sequence += 1 # Odd: write in progress
+        SEQUENCE.pack_into(mm, SEQUENCE_OFFSET, self.sequence)
+        pack(*args)
+        self.sequence += 1 # Even: consistent again
+        HEADER.pack_into(mm, 0, MAGIC, VERSION, self.sequence, self.engine.clock.now_ns(), time.time_ns(),
+                         os.getpid() if pid is None else pid)
+
+    def _pack_stopwatch(self, lap=False, all_laps=False):
+        engine = self.engine
+        mm = self.map
+        laps = engine.stopwatch_laps
+        STOPWATCH.pack_into(mm, STOPWATCH_OFFSET, engine.stopwatch_running, engine.stopwatch_elapsed_ns,
+                            engine.stopwatch_start_ns or 0, len(laps))
+        if not laps:
+            LAP_STATS.pack_into(mm, LAP_STATS_OFFSET, NAN, NAN, NAN, NAN)
+            return
+        if not (lap or all_laps):
+            return
+        LAP_STATS.pack_into(mm, LAP_STATS_OFFSET, laps.best, laps.worst, laps.mean, laps.stdev)
+        n = len(laps)
+        if lap and n <= MAX_LAPS:
+            struct.pack_into("<d", mm, LAPS_OFFSET + (n - 1) * 8, laps.times[-1]) # Just the new lap
+        else:
+            recent = laps.times[-MAX_LAPS:].tobytes() # The window of recent laps moved
+            mm[LAPS_OFFSET:LAPS_OFFSET + len(recent)] = recent
+
+    def _pack_timer(self, name):
+        slot = self.slots.get(name)
+        if slot is None:
+            if len(self.names) == MAX_TIMERS:
+                return
+            slot = self.slots[name] = len(self.names)
+            self.names.append(name)
+            TIMER_COUNT.pack_into(self.map, TIMER_COUNT_OFFSET, len(self.names))
+        cd = self.engine.timers.get(name)
+        TIMER.pack_into(self.map, TIMERS_OFFSET + slot * TIMER.size, name.encode()[:NAME_BYTES], cd.running,
+                        cd.duration, cd.remaining_ns_at(self.engine.clock.now_ns()), cd.deadline_ns or 0)
+
+    def _remove_slot(self, name):
+        # The last slot moves into the freed one
+        slot = self.slots.pop(name, None)
+        if slot is None:
+            return
+        last = self.names.pop()
+        if last != name:
+            self.names[slot] = last
+            self.slots[last] = slot
+            start = TIMERS_OFFSET + len(self.names) * TIMER.size
+            self.map[TIMERS_OFFSET + slot * TIMER.size:TIMERS_OFFSET + (slot + 1) * TIMER.size] = \
+                self.map[start:start + TIMER.size]
+        TIMER_COUNT.pack_into(self.map, TIMER_COUNT_OFFSET, len(self.names))
+
+class StateReader:
+    """Maps the shared region read-only and decodes consistent snapshots of it."""
+
+    def __init__(self, path=None, retries=1000):
+        self.path = path or app_data_path(STATE_FILE)
+        self.retries = retries
+        with open(self.path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), SIZE, access=mmap.ACCESS_READ)
+
+    def close(self):
+        self.map.close()
+
+    def read(self, laps=True):
+        """Returns {'timers', 'stopwatch', 'laps', 'lap_stats', 'pid'} with times live as of now.
+
+        Raises RuntimeError if no consistent snapshot was seen within `retries` attempts.
+        """
+        mm = self.map
+        for _ in range(self.retries):
+            before = SEQUENCE.unpack_from(mm, SEQUENCE_OFFSET)[0]
+            if before & 1:
+                continue
+            magic, version, _, _, _, pid = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC or version != VERSION:
+                raise RuntimeError("no TimerApp state in " + self.path)
+            now = time.monotonic_ns()
+            sw_running, elapsed_ns, start_ns, lap_count = STOPWATCH.unpack_from(mm, STOPWATCH_OFFSET)
+            best, worst, mean, stdev = LAP_STATS.unpack_from(mm, LAP_STATS_OFFSET)
+            recent = None
+            if laps:
+                recent = array('d')
+                recent.frombytes(mm[LAPS_OFFSET:LAPS_OFFSET + min(lap_count, MAX_LAPS) * 8])
+            timers = []
+            for i in range(TIMER_COUNT.unpack_from(mm, TIMER_COUNT_OFFSET)[0]):
+                name, running, duration, remaining_ns, deadline_ns = TIMER.unpack_from(mm, TIMERS_OFFSET + i * TIMER.size)
+                if running:
+                    remaining_ns = max(deadline_ns - now, 0)
+                timers.append({'name': name.rstrip(b"\0").decode(errors="replace"), 'running': running,
+                               'duration': duration, 'remaining': remaining_ns / 1e9})
+            if SEQUENCE.unpack_from(mm, SEQUENCE_OFFSET)[0] != before:
+                continue # Changed while reading
+            if sw_running:
+                elapsed_ns += now - start_ns
+            return {
+                'pid': pid,
+                'timers': timers,
+                'stopwatch': {'running': sw_running, 'time': elapsed_ns / 1e9, 'laps': lap_count},
+                'lap_stats': None if not lap_count else {'best': best, 'worst': worst, 'mean': mean, 'stdev': stdev},
+                'laps': list(recent) if recent is not None else None,
+            }
+        raise RuntimeError("shared state kept changing while being read")
+
+def format_state(state):
+    parts = [f"{t['name']} {t['remaining']:.0f}s{'' if t['running'] else ' (paused)'}" for t in state['timers']
+             if t['running'] or 0 < t['remaining'] < t['duration']]
+    sw = state['stopwatch']
+    if sw['running'] or sw['time']:
+        parts.append(f"stopwatch {sw['time']:.2f}s" + (f" ({sw['laps']} laps)" if sw['laps'] else ""))
+    if not state['pid']:
+        parts.append("(app not running)")
+    return "  ".join(parts) or "idle"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sharedstate", description="Print the running app's state.")
+    parser.add_argument("--watch", action="store_true", help="keep printing the state")
+    parser.add_argument("--interval", type=float, default=0.1, help="seconds between prints with --watch")
+    args = parser.parse_args(argv)
+    try:
+        reader = StateReader()
+    except OSError as e:
+        print(f"No shared state: {e}", file=sys.stderr)
+        return 1
+    try:
+        while True:
+            state = reader.read(laps=False)
+            print(f"\r{format_state(state):<79}" if args.watch else format_state(state), end="", flush=True)
+            if not args.watch:
+                print()
+                return 0
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print()
+        return 130
+    finally:
+        reader.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock import VirtualClock, MonotonicClock, PerfCounterClock, NS_PER_SECOND, to_ns, to_seconds
+from logic import TimerEngine
+
+class ConversionTest(unittest.TestCase):
+    def test_round_trip(self):
+        self.assertEqual(to_ns(1.5), 1_500_000_000)
+        self.assertEqual(to_ns(0.1), 100_000_000) # Rounded, not truncated
+        self.assertEqual(to_seconds(2 * NS_PER_SECOND), 2)
+
+class VirtualClockTest(unittest.TestCase):
+    def test_only_moves_when_told(self):
+        clock = VirtualClock(5)
+        self.assertEqual(clock.now_ns(), 5)
+        self.assertEqual(clock.now_ns(), 5)
+
+    def test_advance(self):
+        clock = VirtualClock()
+        self.assertEqual(clock.advance(1.5), 1_500_000_000)
+        self.assertEqual(clock.advance(ns=7), 1_500_000_007)
+        self.assertEqual(clock.advance(1, ns=1), 2_500_000_008)
+        self.assertEqual(clock.now_ns(), 2_500_000_008)
+
+    def test_set(self):
+        clock = VirtualClock()
+        clock.set(42)
+        self.assertEqual(clock.now_ns(), 42)
+
+class RealClockTest(unittest.TestCase):
+    def test_never_go_backwards(self):
+        for clock in (MonotonicClock(), PerfCounterClock()):
+            readings = [clock.now_ns() for _ in range(1000)]
+            self.assertEqual(readings, sorted(readings))
+
+class EngineClockTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(to_ns(1000))
+        self.engine = TimerEngine(history_path=":memory:", clock=self.clock)
+
+    def tearDown(self):
+        self.engine.close()
+
+    def test_timer_follows_clock(self):
+        self.engine.set_timer(10)
+        self.engine.start_timer()
+        self.assertEqual(self.engine.timer_remaining, 10)
+        self.clock.advance(ns=to_ns(2.5))
+        self.assertEqual(self.engine.timer_remaining, 7.5)
+        self.engine.pause_timer()
+        self.clock.advance(100)
+        self.assertEqual(self.engine.timer_remaining, 7.5)
+
+    def test_stopwatch_follows_clock(self):
+        self.engine.start_stopwatch()
+        self.clock.advance(1.25)
+        self.assertEqual(self.engine.get_stopwatch_time(), 1.25)
+        self.engine.stop_stopwatch()
+        self.clock.advance(10)
+        self.assertEqual(self.engine.get_stopwatch_time(), 1.25)
+        self.engine.start_stopwatch()
+        self.clock.advance(ns=1)
+        self.assertEqual(self.engine.get_stopwatch_ns(), to_ns(1.25) + 1)
+
+    def test_laps_are_exact(self):
+        self.engine.start_stopwatch()
+        for seconds in (1, 2, 3):
+            self.clock.advance(seconds)
+            self.engine.lap_stopwatch()
+        self.assertEqual(list(self.engine.stopwatch_laps), [1, 3, 6])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+import sqlite3
+import datetime
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history import HistoryStore
+
+def rows_on_disk(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+    finally:
+        conn.close()
+
+class HistoryStoreFlushTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "history.db")
+        self.store = HistoryStore(self.path, flush_interval=0.2)
+
+    def tearDown(self):
+        self.store.close()
+        self.folder.cleanup()
+
+    def test_lone_entry_written_at_once(self):
+        self.store.append(60, datetime.datetime.now())
+        self.assertEqual(rows_on_disk(self.path), 1)
+
+    def test_buffered_entries_written_after_flush_interval(self):
+        now = datetime.datetime.now()
+        for _ in range(3):
+            self.store.append(60, now)
+        time.sleep(0.5) # No further append() or read
+        self.assertEqual(rows_on_disk(self.path), 3)
+
+if __name__ == "__main__":
+    unittest.main()
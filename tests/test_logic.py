@@ -0,0 +1,191 @@
+import os
+import sys
+import random
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock import VirtualClock, to_ns
+from logic import MultiTimerEngine, TimerEngine, DEFAULT_TIMER
+
+class MultiTimerEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock()
+        self.timers = MultiTimerEngine(self.clock)
+
+    def names(self, finished):
+        return [cd.name for cd in finished]
+
+    def test_finishes_in_deadline_order(self):
+        for name, seconds in (("c", 3), ("a", 1), ("b", 2)):
+            self.timers.set(name, seconds)
+            self.timers.start(name)
+        self.assertEqual(self.timers.next_deadline(), to_ns(1))
+        self.clock.advance(2.5)
+        self.assertEqual(self.names(self.timers.pop_expired()), ["a", "b"])
+        self.assertEqual(self.timers.get("b").overdue_ns, to_ns(0.5))
+        self.assertEqual(self.timers.next_deadline(), to_ns(3))
+        self.assertEqual(self.timers.running_count, 1)
+
+    def test_nothing_expires_before_deadline(self):
+        self.timers.set("a", 1)
+        self.timers.start("a")
+        self.clock.advance(ns=to_ns(1) - 1)
+        self.assertEqual(self.timers.pop_expired(), [])
+        self.clock.advance(ns=1)
+        self.assertEqual(self.names(self.timers.pop_expired()), ["a"])
+        self.assertEqual(self.timers.get("a").remaining_ns, 0)
+        self.assertFalse(self.timers.get("a").running)
+
+    def test_pause_leaves_stale_entry_that_is_skipped(self):
+        self.timers.set("a", 10)
+        self.timers.start("a")
+        self.clock.advance(4)
+        self.assertTrue(self.timers.pause("a"))
+        self.assertEqual(self.timers.remaining("a"), 6)
+        self.assertIsNone(self.timers.next_deadline())
+        self.clock.advance(20)
+        self.assertEqual(self.timers.pop_expired(), [])
+        self.assertEqual(self.timers.remaining("a"), 6)
+
+    def test_resume_uses_new_deadline(self):
+        self.timers.set("a", 10)
+        self.timers.start("a")
+        self.clock.advance(4)
+        self.timers.pause("a")
+        self.clock.advance(100)
+        self.assertTrue(self.timers.start("a"))
+        self.assertEqual(self.timers.next_deadline(), to_ns(110))
+        self.clock.advance(5)
+        self.assertEqual(self.timers.pop_expired(), [])
+        self.clock.advance(1)
+        self.assertEqual(self.names(self.timers.pop_expired()), ["a"])
+
+    def test_start_and_pause_report_no_change(self):
+        self.timers.set("a", 1)
+        self.assertFalse(self.timers.pause("a"))
+        self.assertTrue(self.timers.start("a"))
+        self.assertFalse(self.timers.start("a"))
+        self.assertEqual(self.timers.running_count, 1)
+        self.timers.set("zero", 0)
+        self.assertFalse(self.timers.start("zero"))
+
+    def test_reset_restores_duration_and_drops_deadline(self):
+        self.timers.set("a", 5)
+        self.timers.start("a")
+        self.clock.advance(3)
+        self.timers.reset("a")
+        self.assertEqual(self.timers.remaining("a"), 5)
+        self.assertEqual(self.timers.running_count, 0)
+        self.clock.advance(10)
+        self.assertEqual(self.timers.pop_expired(), [])
+
+    def test_replace_running_timer(self):
+        self.timers.set("a", 1)
+        self.timers.start("a")
+        self.timers.set("a", 5)
+        self.assertEqual(self.timers.running_count, 0)
+        self.timers.start("a")
+        self.clock.advance(2)
+        self.assertEqual(self.timers.pop_expired(), [])
+        self.clock.advance(3)
+        finished = self.timers.pop_expired()
+        self.assertEqual(self.names(finished), ["a"])
+        self.assertEqual(finished[0].duration, 5)
+
+    def test_remove_running_timer(self):
+        self.timers.set("a", 1)
+        self.timers.start("a")
+        self.timers.remove("a")
+        self.assertNotIn("a", self.timers)
+        self.assertEqual(self.timers.running_count, 0)
+        self.clock.advance(2)
+        self.assertEqual(self.timers.pop_expired(), [])
+
+    def test_compaction_keeps_heap_bounded(self):
+        count = 5000
+        for i in range(count):
+            self.timers.set(f"t{i}", 1 + i % 100)
+            self.timers.start(f"t{i}")
+        # Every pause/resume leaves a stale entry behind
+        for _ in range(3):
+            for i in range(count):
+                self.timers.pause(f"t{i}")
+                self.timers.start(f"t{i}")
+        self.assertLessEqual(len(self.timers._heap), 2 * count + 64)
+        self.clock.advance(100)
+        finished = self.timers.pop_expired()
+        self.assertEqual(len(finished), count)
+        self.assertEqual(len(set(self.names(finished))), count)
+        self.assertEqual(self.timers.running_count, 0)
+
+    def test_random_operations_match_brute_force(self):
+        rng = random.Random(1)
+        names = [f"t{i}" for i in range(200)]
+        for name in names:
+            self.timers.set(name, rng.randint(1, 50))
+        for _ in range(20000):
+            name = rng.choice(names)
+            op = rng.random()
+            if op < 0.4:
+                self.timers.start(name)
+            elif op < 0.6:
+                self.timers.pause(name)
+            elif op < 0.7:
+                self.timers.reset(name)
+            elif op < 0.75:
+                self.timers.set(name, rng.randint(1, 50))
+            else:
+                self.clock.advance(ns=rng.randint(0, to_ns(0.5)))
+                now = self.clock.now_ns()
+                due = {cd.name for cd in self.timers.timers.values() if cd.running and cd.deadline_ns <= now}
+                self.assertEqual(set(self.names(self.timers.pop_expired())), due)
+            running = [cd for cd in self.timers.timers.values() if cd.running]
+            self.assertEqual(self.timers.running_count, len(running))
+            self.assertEqual(self.timers.next_deadline(), min((cd.deadline_ns for cd in running), default=None))
+
+class TimerEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock()
+        self.engine = TimerEngine(history_path=":memory:", clock=self.clock)
+        self.events = []
+        self.engine.add_listener(lambda event, data: self.events.append((event, data)))
+
+    def tearDown(self):
+        self.engine.close()
+
+    def test_update_timer_finish_path(self):
+        self.engine.set_timer(2)
+        self.engine.start_timer()
+        self.clock.advance(1)
+        self.assertEqual(self.engine.update_timer(), (1, False))
+        self.clock.advance(1)
+        self.assertEqual(self.engine.update_timer(), (0, True))
+        self.assertIn(('timer_finished', {'name': DEFAULT_TIMER, 'duration': 2}), self.events)
+        self.assertEqual(len(self.engine.history), 1)
+        self.assertFalse(self.engine.timer_running)
+        # Finishes once; later updates only report the remaining time
+        self.clock.advance(1)
+        self.assertEqual(self.engine.update_timer(), (0, False))
+        self.assertEqual(len(self.engine.history), 1)
+
+    def test_named_timer_does_not_finish_default(self):
+        self.engine.set_timer(5)
+        self.engine.start_timer()
+        self.engine.set_timer(1, "tea")
+        self.engine.start_timer("tea")
+        self.clock.advance(1)
+        self.assertEqual(self.engine.update_timer(), (4, False))
+        finished = [data['name'] for event, data in self.events if event == 'timer_finished']
+        self.assertEqual(finished, ["tea"])
+
+    def test_next_deadline_follows_engine_clock(self):
+        self.clock.set(to_ns(1000))
+        self.engine.set_timer(30, "tea")
+        self.engine.start_timer("tea")
+        self.assertEqual(self.engine.next_deadline(), to_ns(1030))
+        self.engine.pause_timer("tea")
+        self.assertIsNone(self.engine.next_deadline())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock import VirtualClock, to_ns
+from logic import TimerEngine, DEFAULT_TIMER
+from persistence import StateJournal, unlock_file
+
+START_WALL_NS = to_ns(1_700_000_000)
+
+def stop_worker(journal):
+    journal.stop_syncing.set()
+    journal.wake.set()
+    journal.worker.join()
+
+def crash(journal):
+    """Drops the journal the way a killed process would: no final snapshot."""
+    journal.engine.remove_listener(journal.on_engine_event)
+    if journal.worker.is_alive():
+        stop_worker(journal)
+    journal.wal.close() # Already flushed to the OS by append()
+    unlock_file(journal.lock_file)
+
+class StateJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.engines = []
+
+    def tearDown(self):
+        for engine in self.engines:
+            engine.close()
+        self.folder.cleanup()
+
+    def engine(self, wall_ns=START_WALL_NS):
+        engine = TimerEngine(history_path=":memory:", clock=VirtualClock(), wall_clock=VirtualClock(wall_ns))
+        self.engines.append(engine)
+        return engine
+
+    def journal(self, engine, **kwargs):
+        return StateJournal(engine, self.folder.name, **kwargs).open()
+
+    def test_clean_close_restores_everything(self):
+        engine = self.engine()
+        journal = self.journal(engine)
+        engine.set_timer(60, "tea")
+        engine.start_timer("tea")
+        engine.clock.advance(10)
+        engine.pause_timer("tea")
+        engine.set_schedule("standup", {'every': 3600})
+        journal.close()
+        restored = self.engine()
+        self.journal(restored).close()
+        self.assertEqual(restored.timers.remaining("tea"), 50)
+        self.assertFalse(restored.timers.get("tea").running)
+        self.assertIn("standup", restored.schedules)
+        self.assertEqual(restored.schedules.next_ns["standup"], engine.schedules.next_ns["standup"])
+
+    def test_crash_replays_wal(self):
+        engine = self.engine()
+        journal = self.journal(engine)
+        engine.set_timer(300, "tea")
+        engine.start_timer("tea")
+        engine.set_timer(5, "gone")
+        engine.remove_timer("gone")
+        engine.start_stopwatch()
+        for _ in range(3):
+            engine.clock.advance(1)
+            engine.lap_stopwatch()
+        crash(journal)
+        # The app comes back 20 s of wall time later
+        restored = self.engine(START_WALL_NS + to_ns(20))
+        journal = self.journal(restored)
+        self.assertEqual(restored.timers.remaining("tea"), 280)
+        self.assertTrue(restored.timers.get("tea").running)
+        self.assertNotIn("gone", restored.timers)
+        self.assertEqual(list(restored.stopwatch_laps), [1, 2, 3])
+        self.assertTrue(restored.stopwatch_running)
+        self.assertEqual(restored.get_stopwatch_time(), 20)
+        journal.close()
+
+    def test_timer_that_expired_while_down_finishes_on_update(self):
+        engine = self.engine()
+        journal = self.journal(engine)
+        engine.set_timer(30, "tea")
+        engine.start_timer("tea")
+        crash(journal)
+        restored = self.engine(START_WALL_NS + to_ns(3600))
+        journal = self.journal(restored)
+        self.assertEqual(restored.timers.get("tea").remaining_ns, 1) # Finishes on the next update
+        restored.clock.advance(ns=1)
+        finished = restored.update_timers()
+        self.assertEqual([cd.name for cd in finished], ["tea"])
+        journal.close()
+
+    def test_torn_last_record_is_ignored(self):
+        engine = self.engine()
+        journal = self.journal(engine)
+        engine.set_timer(60, "tea")
+        path = journal.wal_path(journal.generation)
+        crash(journal)
+        with open(path, "a") as f:
+            f.write('{"t":"timer","name":"torn"')
+        restored = self.engine()
+        self.journal(restored).close()
+        self.assertIn("tea", restored.timers)
+        self.assertNotIn("torn", restored.timers)
+
+    def test_crash_before_snapshot_written(self):
+        engine = self.engine()
+        journal = self.journal(engine)
+        engine.set_timer(60, "a")
+        stop_worker(journal)
+        journal.snapshot() # Moves to a new WAL, but nothing writes the snapshot
+        engine.set_timer(90, "b")
+        self.assertEqual(journal.wal_generations(), [1, 2])
+        crash(journal)
+        restored = self.engine()
+        self.journal(restored).close()
+        self.assertEqual(restored.timers.get("a").duration, 60)
+        self.assertEqual(restored.timers.get("b").duration, 90)
+
+    def test_compaction_removes_old_generations(self):
+        engine = self.engine()
+        journal = self.journal(engine, compact_after=10)
+        for i in range(35):
+            engine.set_timer(i + 1, f"t{i}")
+        journal.close()
+        generations = journal.wal_generations()
+        self.assertEqual(generations, [journal.generation])
+        with open(journal.snapshot_path) as f:
+            self.assertEqual(json.load(f)['generation'], journal.generation)
+        restored = self.engine()
+        self.journal(restored).close()
+        self.assertEqual(len(restored.timers), 36) # With the default timer
+        self.assertEqual(restored.timers.get("t34").duration, 35)
+
+    def test_wal_older_than_snapshot_is_not_replayed(self):
+        engine = self.engine()
+        journal = self.journal(engine)
+        engine.set_timer(60, "tea")
+        journal.close()
+        # A leftover file whose cleanup failed
+        with open(journal.wal_path(0), "w") as f:
+            f.write(json.dumps(dict(engine.timer_state("tea"), t='timer', name="stale", event='timer_set')) + "\n")
+        restored = self.engine()
+        self.journal(restored).close()
+        self.assertIn("tea", restored.timers)
+        self.assertNotIn("stale", restored.timers)
+
+    def test_worker_sleeps_until_a_record_is_unsynced(self):
+        engine = self.engine()
+        journal = self.journal(engine, fsync_interval=0.05)
+        time.sleep(0.1) # Let the worker settle after open()
+        syncs = []
+        sync = journal._sync
+        journal._sync = lambda: (syncs.append(journal.unsynced), sync())
+        time.sleep(0.3)
+        self.assertEqual(syncs, [])
+        engine.set_timer(60, "tea")
+        time.sleep(0.3)
+        self.assertEqual(syncs, [1])
+        self.assertEqual(journal.unsynced, 0)
+        journal.close()
+
+    def test_locked_folder_is_left_alone(self):
+        engine = self.engine()
+        journal = self.journal(engine)
+        engine.set_timer(60, "tea")
+        other = self.engine()
+        second = self.journal(other)
+        self.assertIsNone(second.lock_file)
+        self.assertNotIn("tea", other.timers)
+        other.set_timer(5, "ignored")
+        second.close()
+        journal.close()
+        restored = self.engine()
+        self.journal(restored).close()
+        self.assertIn("tea", restored.timers)
+        self.assertNotIn("ignored", restored.timers)
+        self.assertIn(DEFAULT_TIMER, restored.timers)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import sys
+import datetime
+import unittest
+try:
+    import zoneinfo
+except ImportError:
+    zoneinfo = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock import VirtualClock, NS_PER_SECOND, to_ns
+from logic import TimerEngine
+from recurrence import (CalendarSchedule, IntervalSchedule, Scheduler, TransitionTable, make_schedule, parse_days,
+                        transitions, WEEKDAYS, EVERY_DAY)
+
+ZONE = "America/New_York"
+
+def epoch_ns(*fields, fold=0):
+    tz = zoneinfo.ZoneInfo(ZONE)
+    return int(datetime.datetime(*fields, tzinfo=tz, fold=fold).timestamp()) * NS_PER_SECOND
+
+@unittest.skipUnless(zoneinfo, "needs zoneinfo")
+class CalendarScheduleDstTest(unittest.TestCase):
+    def test_plain_day(self):
+        schedule = CalendarSchedule(9, 0, zone=ZONE)
+        self.assertEqual(schedule.next_after(epoch_ns(2024, 6, 1, 8)), epoch_ns(2024, 6, 1, 9))
+        # Strictly after: the occurrence itself moves on to the next day
+        self.assertEqual(schedule.next_after(epoch_ns(2024, 6, 1, 9)), epoch_ns(2024, 6, 2, 9))
+
+    def test_time_in_spring_gap_runs_after_transition(self):
+        # 02:30 does not exist on 2024-03-10; zoneinfo reads it as 03:30 EDT
+        schedule = CalendarSchedule(2, 30, zone=ZONE)
+        fire = schedule.next_after(epoch_ns(2024, 3, 9, 12))
+        self.assertEqual(fire, epoch_ns(2024, 3, 10, 3, 30))
+        self.assertEqual(schedule.next_after(fire), epoch_ns(2024, 3, 11, 2, 30))
+
+    def test_time_in_autumn_fold_fires_once(self):
+        # 01:30 happens twice on 2024-11-03; only the first one fires
+        schedule = CalendarSchedule(1, 30, zone=ZONE)
+        fire = schedule.next_after(epoch_ns(2024, 11, 2, 12))
+        self.assertEqual(fire, epoch_ns(2024, 11, 3, 1, 30, fold=0))
+        self.assertEqual(schedule.next_after(fire), epoch_ns(2024, 11, 4, 1, 30))
+
+    def test_keeps_local_time_across_transitions(self):
+        schedule = CalendarSchedule(9, 0, zone=ZONE)
+        t = epoch_ns(2024, 3, 1)
+        for _ in range(300):
+            t = schedule.next_after(t)
+            local = datetime.datetime.fromtimestamp(t // NS_PER_SECOND, zoneinfo.ZoneInfo(ZONE))
+            self.assertEqual((local.hour, local.minute), (9, 0))
+
+    def test_to_utc_matches_zoneinfo(self):
+        table = transitions(ZONE)
+        tz = zoneinfo.ZoneInfo(ZONE)
+        start = datetime.datetime(2024, 1, 1)
+        for quarter in range(0, 366 * 96, 7): # Every 1h45m, so every time of day comes up
+            local = start + datetime.timedelta(minutes=15 * quarter)
+            local_seconds = int(local.replace(tzinfo=datetime.timezone.utc).timestamp())
+            self.assertEqual(table.to_utc(local_seconds), int(local.replace(tzinfo=tz).timestamp()), local)
+
+    def test_weekdays_skip_weekend(self):
+        schedule = CalendarSchedule(10, 0, WEEKDAYS, zone=ZONE)
+        friday = epoch_ns(2024, 3, 8, 11) # The weekend before the spring transition
+        self.assertEqual(schedule.next_after(friday), epoch_ns(2024, 3, 11, 10))
+
+class TransitionTableTest(unittest.TestCase):
+    def test_finds_transitions_to_the_second(self):
+        switch = 1_700_000_123
+        table = TransitionTable(lambda t: 3600 if t >= switch else 0)
+        table.cover(switch - 10 * 86400, switch + 10 * 86400)
+        self.assertEqual(table.offset_at(switch - 1), 0)
+        self.assertEqual(table.offset_at(switch), 3600)
+
+    def test_grows_backwards_on_cover(self):
+        switch = 1_000_000_000 # Years before the table's initial range
+        table = TransitionTable(lambda t: -3600 if t < switch else 0)
+        table.cover(switch - 86400, switch + 86400)
+        self.assertEqual(table.offset_at(switch - 1), -3600)
+        self.assertEqual(table.offset_at(switch), 0)
+
+class MissedFireTest(unittest.TestCase):
+    def setUp(self):
+        self.wall = VirtualClock(to_ns(1_700_000_000))
+        self.scheduler = Scheduler(self.wall)
+
+    def test_interval_fires_once_with_missed_count(self):
+        anchor = self.wall.now_ns()
+        self.scheduler.add("ping", IntervalSchedule(60, anchor))
+        self.assertEqual(self.scheduler.next_deadline(), anchor + to_ns(60))
+        self.wall.advance(10 * 60 + 30)
+        self.assertEqual(self.scheduler.pop_due(), [("ping", anchor + to_ns(60), 9)])
+        self.assertEqual(self.scheduler.next_deadline(), anchor + to_ns(11 * 60))
+        self.assertEqual(self.scheduler.pop_due(), [])
+
+    def test_on_time_fire_misses_nothing(self):
+        anchor = self.wall.now_ns()
+        self.scheduler.add("ping", IntervalSchedule(60, anchor))
+        self.wall.advance(60)
+        self.assertEqual(self.scheduler.pop_due(), [("ping", anchor + to_ns(60), 0)])
+
+    @unittest.skipUnless(zoneinfo, "needs zoneinfo")
+    def test_calendar_fires_once_after_sleep(self):
+        self.wall.set(epoch_ns(2024, 3, 8, 8))
+        self.scheduler.add("standup", CalendarSchedule(9, 0, EVERY_DAY, zone=ZONE))
+        # Asleep over the weekend and the spring transition
+        self.wall.set(epoch_ns(2024, 3, 11, 12))
+        self.assertEqual(self.scheduler.pop_due(), [("standup", epoch_ns(2024, 3, 8, 9), 3)])
+        self.assertEqual(self.scheduler.next_deadline(), epoch_ns(2024, 3, 12, 9))
+
+    def test_replace_and_remove(self):
+        self.scheduler.add("a", IntervalSchedule(60, self.wall.now_ns()))
+        self.scheduler.add("a", IntervalSchedule(120, self.wall.now_ns()))
+        self.wall.advance(60)
+        self.assertEqual(self.scheduler.pop_due(), [])
+        self.scheduler.remove("a")
+        self.wall.advance(600)
+        self.assertEqual(self.scheduler.pop_due(), [])
+        self.assertIsNone(self.scheduler.next_deadline())
+
+    def test_engine_reports_missed_occurrences(self):
+        clock = VirtualClock()
+        engine = TimerEngine(history_path=":memory:", clock=clock, wall_clock=self.wall)
+        events = []
+        engine.add_listener(lambda event, data: events.append((event, data)))
+        engine.set_schedule("ping", {'every': 60})
+        self.assertEqual(engine.next_deadline(), to_ns(60))
+        self.wall.advance(185)
+        clock.advance(185)
+        engine.update_timers()
+        fired = [data for event, data in events if event == 'schedule_fired']
+        self.assertEqual(len(fired), 1)
+        self.assertEqual(fired[0]['missed'], 2)
+        engine.close()
+
+class ParseTest(unittest.TestCase):
+    def test_parse_days(self):
+        self.assertEqual(parse_days("weekdays"), WEEKDAYS)
+        self.assertEqual(parse_days("mon,wed,fri"), (0, 2, 4))
+        self.assertEqual(parse_days("fri-mon"), (0, 4, 5, 6))
+        with self.assertRaises(ValueError):
+            parse_days("someday")
+
+    def test_make_schedule(self):
+        schedule = make_schedule({'at': '07:45', 'days': 'weekends', 'zone': None})
+        self.assertEqual(schedule.spec, {'at': '07:45', 'days': [5, 6], 'zone': None})
+        self.assertEqual(make_schedule({'every': 30}, 5).spec, {'every': 30.0, 'anchor_ns': 5})
+        for spec in ({}, {'every': 0}, {'at': '25:00'}):
+            with self.assertRaises(ValueError):
+                make_schedule(spec, 0)
+
+if __name__ == "__main__":
+    unittest.main()
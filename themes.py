@@ -0,0 +1,64 @@
+THEMES = {
+    'dark': {
+        'window': "#2b2b2b", 'text': "#ffffff", 'button': "#3b3b3b", 'border': "#555",
+        'hover': "#4b4b4b", 'checked': "#0078d7", 'checked_text': "white", 'base': "#333",
+    },
+    'light': {
+        'window': "#f0f0f0", 'text': "#000000", 'button': "#e0e0e0", 'border': "#ccc",
+        'hover': "#d0d0d0", 'checked': "#0078d7", 'checked_text': "white", 'base': "white",
+    },
+}
+
+# Widgets opt into state colors with a dynamic "state" property (see ThemeEngine.set_state)
+TEMPLATE = """
+QMainWindow {{ background-color: {window}; color: {text}; }}
+QWidget {{ color: {text}; }}
+QPushButton {{
+    background-color: {button};
+    border: 1px solid {border};
+    border-radius: 5px;
+    padding: 5px;
+    color: {text};
+}}
+QPushButton:hover {{ background-color: {hover}; }}
+QPushButton:checked {{ background-color: {checked}; color: {checked_text}; }}
+QPushButton[state="running"] {{ background-color: #f44336; color: white; }}
+QPushButton[state="stopped"] {{ background-color: #4CAF50; color: white; }}
+QListWidget, QListView {{ background-color: {base}; border: 1px solid {border}; }}
+QComboBox, QSpinBox {{ background-color: {base}; border: 1px solid {border}; color: {text}; }}
+QLabel {{ color: {text}; }}
+"""
+
+class ThemeEngine:
+    """Applies themes from stylesheets built once per theme.
+
+    Switching themes sets one stylesheet on the window, which Qt parses and
+    applies in a single repolish, and does nothing if the theme is already
+    applied. State colors (e.g. the stopwatch start/stop button) are rules
+    on a "state" property in the same stylesheet, so changing a state only
+    repolishes that widget.
+    """
+
+    def __init__(self, themes=THEMES):
+        self.themes = themes
+        self.compiled = {}
+        self.applied = {} # id(widget) -> theme name
+
+    def stylesheet(self, name):
+        if name not in self.compiled:
+            self.compiled[name] = TEMPLATE.format(**self.themes[name])
+        return self.compiled[name]
+
+    def apply(self, widget, name):
+        if self.applied.get(id(widget)) == name:
+            return
+        widget.setStyleSheet(self.stylesheet(name))
+        self.applied[id(widget)] = name
+
+    @staticmethod
+    def set_state(widget, state):
+        """Sets the widget's "state" property and repolishes just that widget if it changed."""
+        if widget.property("state") == state:
+            return
+        widget.setProperty("state", state)
+        widget.style().polish(widget) # Re-matches the widget's rules against the parsed stylesheet
@@ -0,0 +1,105 @@
+"""Time rendering shared by the displays, history, laps and the command line.
+
+Durations render as MM:SS, or HH:MM:SS from one hour, with an optional
+.cc (centiseconds). Strings come from tables built at import: every
+"MM:SS" below an hour, the two-digit numbers and the ".cc" suffixes, so
+formatting a duration is a lookup or two and no arithmetic on strings.
+Values are expected to be non-negative.
+"""
+
+TWO_DIGITS = tuple(f"{i:02}" for i in range(100))
+MIN_SEC = tuple(f"{m:02}:{s:02}" for m in range(60) for s in range(60)) # index: seconds below an hour
+CENTIS = tuple(f".{i:02}" for i in range(100))
+
+def _hours(hours):
+    return TWO_DIGITS[hours] if hours < 100 else str(hours)
+
+def format_duration(seconds, centiseconds=False):
+    """Formats seconds as MM:SS or HH:MM:SS, with .cc if `centiseconds` (truncated, like a stopwatch)."""
+    if centiseconds:
+        whole, cs = divmod(int(seconds * 100 + 1e-6), 100)
+    else:
+        whole = int(seconds)
+    if whole < 3600:
+        text = MIN_SEC[whole]
+    else:
+        hours, rest = divmod(whole, 3600)
+        text = _hours(hours) + ":" + MIN_SEC[rest]
+    return text + CENTIS[cs] if centiseconds else text
+
+def format_durations(values, centiseconds=False):
+    """Formats a sequence of durations (list, array('d'), NumPy array, ...) in one pass; returns a list."""
+    min_sec, two_digits, centis = MIN_SEC, TWO_DIGITS, CENTIS
+    out = []
+    append = out.append
+    for v in values:
+        if centiseconds:
+            whole, cs = divmod(int(v * 100 + 1e-6), 100)
+            suffix = centis[cs]
+        else:
+            whole = int(v)
+            suffix = ""
+        if whole < 3600:
+            append(min_sec[whole] + suffix)
+        else:
+            hours, rest = divmod(whole, 3600)
+            append((two_digits[hours] if hours < 100 else str(hours)) + ":" + min_sec[rest] + suffix)
+    return out
+
+def format_total(seconds):
+    """Formats a total of many timers: '3h 05m', or '25m 00s' below an hour."""
+    mins, secs = divmod(int(seconds), 60)
+    hours, mins = divmod(mins, 60)
+    if hours > 0:
+        return f"{hours}h {mins:02}m"
+    return f"{mins}m {secs:02}s"
+
+class DurationDisplay:
+    """Renders one display's duration, reusing the last string while the shown value is unchanged.
+
+    With centiseconds, the HH:MM:SS part is rebuilt only when the second
+    changes; each centisecond just appends its suffix.
+    """
+
+    def __init__(self, centiseconds=False):
+        self.centiseconds = centiseconds
+        self.key = None # Shown value in display units (seconds or centiseconds)
+        self.whole = None
+        self.base = ""
+        self.text = ""
+
+    def render(self, seconds):
+        if self.centiseconds:
+            key = int(seconds * 100 + 1e-6)
+            if key != self.key:
+                self.key = key
+                whole, cs = divmod(key, 100)
+                if whole != self.whole:
+                    self.whole = whole
+                    self.base = format_duration(whole)
+                self.text = self.base + CENTIS[cs]
+        else:
+            key = int(seconds)
+            if key != self.key:
+                self.key = key
+                self.text = format_duration(key)
+        return self.text
+
+class ClockDisplay:
+    """Renders the wall clock, formatting only when the second or the 12/24h setting changes."""
+
+    def __init__(self):
+        self.key = None
+        self.text = ""
+
+    def render(self, now, twenty_four=True):
+        key = (now.hour * 60 + now.minute) * 60 + now.second
+        if not twenty_four:
+            key = -key - 1 # Separate cache entry for the 12h format
+        if key != self.key:
+            self.key = key
+            if twenty_four:
+                self.text = TWO_DIGITS[now.hour] + ":" + MIN_SEC[now.minute * 60 + now.second]
+            else:
+                self.text = now.strftime("%I:%M:%S %p") # Locale's AM/PM
+        return self.text
@@ -0,0 +1,174 @@
+import os
+import json
+import time
+import bisect
+import datetime
+import threading
+from paths import app_data_path
+
+REMOTE_URL = "http://worldtimeapi.org/api/timezone"
+MAX_AGE = 7 * 24 * 3600 # Seconds before the cached remote list is revalidated
+
+def backend_names(backend="zoneinfo"):
+    """Zone names known to the local timezone library."""
+    if backend == "pytz":
+        import pytz
+        return list(pytz.all_timezones)
+    import zoneinfo
+    return sorted(zoneinfo.available_timezones())
+
+def format_offset(delta):
+    minutes = int(delta.total_seconds() // 60)
+    sign = "+" if minutes >= 0 else "-"
+    hours, minutes = divmod(abs(minutes), 60)
+    return f"UTC{sign}{hours:02}:{minutes:02}"
+
+class TimezoneCatalog:
+    """Time zone names with search and precomputed UTC offsets, built once per process.
+
+    The list comes from a disk cache of the worldtimeapi.org list when there
+    is one, else from the local timezone library, so building it never
+    touches the network. refresh() revalidates the cache with a conditional
+    request (ETag / Last-Modified) once it is older than MAX_AGE.
+    """
+
+    def __init__(self, cache_path=None, backend="zoneinfo"):
+        self.cache_path = cache_path or app_data_path("timezones.json")
+        self.backend = backend
+        self.lock = threading.Lock()
+        self.meta = {} # etag, last_modified, fetched_at of the cached remote list
+        names = self._load_cache() or backend_names(backend)
+        self.install(self.prepare(names))
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return self.index(name) >= 0
+
+    def index(self, name):
+        """Returns the row of `name`, or -1."""
+        i = bisect.bisect_left(self.names, name)
+        return i if i < len(self.names) and self.names[i] == name else -1
+
+    def search(self, query, limit=None):
+        """Returns matching names: prefix matches first (by bisection), then substring matches.
+
+        Matching ignores case and treats spaces as underscores, so "new y"
+        finds America/New_York.
+        """
+        query = query.strip().lower().replace(" ", "_")
+        if not query:
+            return list(self.names[:limit] if limit else self.names)
+        lower = self._lower
+        i = bisect.bisect_left(lower, query)
+        prefix = []
+        while i < len(lower) and lower[i].startswith(query):
+            prefix.append(self._sorted_names[i])
+            i += 1
+        seen = set(prefix)
+        results = prefix + [name for name, key in zip(self.names, self._keys)
+                            if query in key and name not in seen]
+        return results[:limit] if limit else results
+
+    def prepare(self, names):
+        """Builds the lists for `names` without touching the ones in use; pass the result to install()."""
+        names = sorted(set(names))
+        # Offsets as of now; they only change at DST transitions
+        offsets = {}
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for name in names:
+            tz = self._tzinfo(name)
+            offsets[name] = format_offset(now.astimezone(tz).utcoffset()) if tz else ""
+        keys = [name.lower() for name in names]
+        order = sorted(range(len(names)), key=keys.__getitem__)
+        return names, offsets, keys, [keys[i] for i in order], [names[i] for i in order]
+
+    def install(self, prepared):
+        with self.lock:
+            self.names, self.offsets, self._keys, self._lower, self._sorted_names = prepared
+
+    def _tzinfo(self, name):
+        try:
+            if self.backend == "pytz":
+                import pytz
+                return pytz.timezone(name)
+            import zoneinfo
+            return zoneinfo.ZoneInfo(name)
+        except Exception:
+            return None
+
+    # --- Disk cache and remote refresh ---
+    def _load_cache(self):
+        try:
+            with open(self.cache_path) as f:
+                data = json.load(f)
+            self.meta = data.get('meta', {})
+            return data['names']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_cache(self, names):
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({'meta': self.meta, 'names': names}, f)
+        os.replace(tmp, self.cache_path)
+
+    def needs_refresh(self):
+        return time.time() - self.meta.get('fetched_at', 0) >= MAX_AGE
+
+    def refresh(self, timeout=2, force=False, install=None):
+        """Revalidates the remote list if the cache is stale; returns True if the names changed.
+
+        New lists are built on the calling thread and handed to `install`
+        (default: self.install), e.g. to swap them in on the GUI thread.
+        """
+        if not force and not self.needs_refresh():
+            return False
+        headers = {}
+        if self.meta.get('etag'):
+            headers['If-None-Match'] = self.meta['etag']
+        if self.meta.get('last_modified'):
+            headers['If-Modified-Since'] = self.meta['last_modified']
+        try:
+            import requests
+            response = requests.get(REMOTE_URL, headers=headers, timeout=timeout)
+        except Exception:
+            return False # Keep what we have
+        if response.status_code == 304:
+            self.meta['fetched_at'] = time.time()
+            self._save_cache(self.names)
+            return False
+        if response.status_code != 200:
+            return False
+        try:
+            names = [str(name) for name in response.json()]
+        except ValueError:
+            return False
+        self.meta = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time(),
+        }
+        names = sorted(set(names))
+        changed = names != self.names
+        if changed:
+            (install or self.install)(self.prepare(names))
+        self._save_cache(names)
+        return changed
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+def get_catalog():
+    """Returns the process-wide catalog, building it on first use."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            try:
+                import zoneinfo # noqa: F401
+                backend = "zoneinfo"
+            except ImportError:
+                backend = "pytz"
+            _catalog = TimezoneCatalog(backend=backend)
+        return _catalog